@@ -0,0 +1,368 @@
+"""
+sqlite stand-in for the RDS MySQL instance, used by the benchmark suite.
+
+The handlers' MySQL statements are rewritten to sqlite on the fly (DATE_SUB,
+the -> JSON operator, INSERT IGNORE, ON DUPLICATE KEY UPDATE, ...) and the
+JSON functions they use are registered as Python functions. Every execute()
+is counted as one round trip, and every row it returns as one row
+transferred, so runs can be compared without a real database.
+"""
+import datetime
+import json
+import re
+import sqlite3
+import threading
+
+_MISSING = object()
+
+def _parse_path(path):
+    # $."a".b[0][1 to 3][*]
+    if not path.startswith("$"):
+        raise ValueError(f"unsupported JSON path: {path}")
+
+    steps = []
+    i = 1
+    while i < len(path):
+        if path[i] == ".":
+            i += 1
+            if path[i] == '"':
+                end = path.index('"', i + 1)
+                steps.append(("key", path[i + 1:end]))
+                i = end + 1
+            else:
+                key = re.match(r"[A-Za-z0-9_]+", path[i:]).group(0)
+                steps.append(("key", key))
+                i += len(key)
+        elif path[i] == "[":
+            end = path.index("]", i)
+            inner = path[i + 1:end].strip()
+            if inner == "*":
+                steps.append(("all", None))
+            elif " to " in inner:
+                first, last = inner.split(" to ")
+                steps.append(("range", (int(first), int(last))))
+            else:
+                steps.append(("index", int(inner)))
+            i = end + 1
+        else:
+            raise ValueError(f"unsupported JSON path: {path}")
+    return steps
+
+def _extract(doc, path):
+    # like MySQL, paths with a range or wildcard always return an array of their matches
+    values = [doc]
+    wrap = False
+    for kind, arg in _parse_path(path):
+        matched = []
+        for value in values:
+            if kind == "key":
+                if isinstance(value, dict) and arg in value:
+                    matched.append(value[arg])
+            elif kind == "index":
+                if isinstance(value, list) and arg < len(value):
+                    matched.append(value[arg])
+            else:
+                wrap = True
+                if isinstance(value, list):
+                    matched.extend(value if kind == "all" else value[arg[0]:arg[1] + 1])
+        values = matched
+
+    if not values:
+        return _MISSING
+    return values if wrap else values[0]
+
+def _load(value):
+    if value is None:
+        return _MISSING
+    if isinstance(value, (bytes, str)):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return _MISSING
+    return value
+
+def _contains(target, candidate):
+    if isinstance(target, list):
+        if isinstance(candidate, list):
+            return all(_contains(target, item) for item in candidate)
+        return any(_contains(item, candidate) for item in target)
+    if isinstance(target, dict):
+        return isinstance(candidate, dict) and all(key in target and _contains(target[key], value) for key, value in candidate.items())
+    if isinstance(candidate, (list, dict)):
+        return False
+    return target == candidate
+
+def json_extract(doc, path):
+    doc = _load(doc)
+    if doc is _MISSING:
+        return None
+    value = _extract(doc, path)
+    return None if value is _MISSING else json.dumps(value)
+
+def json_contains(target, candidate, path=None):
+    target = _load(target)
+    candidate = _load(candidate)
+    if target is _MISSING or candidate is _MISSING:
+        return None
+    if path is not None:
+        target = _extract(target, path)
+        if target is _MISSING:
+            return None
+    return 1 if _contains(target, candidate) else 0
+
+def json_length(doc, path=None):
+    doc = _load(doc)
+    if doc is not _MISSING and path is not None:
+        doc = _extract(doc, path)
+    if doc is _MISSING:
+        return None
+    return len(doc) if isinstance(doc, (list, dict)) else 1
+
+def json_object(*args):
+    return json.dumps({args[i]: args[i + 1] for i in range(0, len(args), 2)})
+
+def json_quote(value):
+    return None if value is None else json.dumps(value)
+
+def json_valid(value):
+    return 0 if _load(value) is _MISSING else 1
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _unix_timestamp(value):
+    if value is None:
+        return None
+    return datetime.datetime.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+
+def _from_unixtime(value):
+    return datetime.datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+
+_TRANSLATIONS = (
+    (re.compile(r"DATE_SUB\(NOW\(\), INTERVAL (\S+) DAY\)", re.I), r"datetime('now', 'localtime', '-' || \1 || ' days')"),
+    (re.compile(r"(\b[\w.]+)->('[^']*')"), r"JSON_EXTRACT(\1, \2)"),
+    (re.compile(r"\bIF\(", re.I), "IIF("),
+    (re.compile(r"\bINSERT IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"ON DUPLICATE KEY UPDATE", re.I), "ON CONFLICT DO UPDATE SET"),
+    (re.compile(r"VALUES\((\w+)\)"), r"excluded.\1"),
+)
+
+def translate(query):
+    for pattern, replacement in _TRANSLATIONS:
+        query = pattern.sub(replacement, query)
+    return query.replace("%s", "?").replace("%%", "%")
+
+#FakeConnections on different threads share one sqlite connection, which runs one statement at a time
+_statementLock = threading.RLock()
+
+class QueryStats:
+    """
+    Round trips and rows transferred since the last reset().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.roundTrips = 0
+        self.rows = 0
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self._rows = []
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def execute(self, query, args=None):
+        if args is None:
+            params = ()
+        elif isinstance(args, (list, tuple)):
+            params = tuple(args)
+        else:
+            params = (args,)
+
+        self.conn.stats.roundTrips += 1
+        with _statementLock:
+            cur = self.conn.db.execute(translate(query), params)
+            self._rows = cur.fetchall() if cur.description else []
+        self._position = 0
+        self.rowcount = len(self._rows) if cur.description else cur.rowcount
+        self.conn.stats.rows += len(self._rows)
+        return self.rowcount
+
+    def executemany(self, query, argsList):
+        for args in argsList:
+            self.execute(query, args)
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return tuple(self._rows[self._position - 1])
+
+    def fetchall(self):
+        rows = tuple(tuple(row) for row in self._rows[self._position:])
+        self._position = len(self._rows)
+        return rows
+
+class FakeConnection:
+    """
+    Just enough of a pymysql connection for mix_db and the shared modules.
+    """
+
+    def __init__(self, db, stats):
+        self.db = db
+        self.stats = stats
+        self.open = True
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.stats.roundTrips += 1
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=True):
+        self.stats.roundTrips += 1
+
+    def close(self):
+        self.open = False
+
+def _convert_datetime(value):
+    text = value.decode()
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return text
+
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_adapter(datetime.datetime, lambda value: value.strftime("%Y-%m-%d %H:%M:%S"))
+
+#sqlite versions of the production tables, including everything added under migrations/. Secondary
+#indexes must match the migrations exactly (tests/test_fake_rds.py checks), or the benchmark measures
+#plans production cannot use
+SCHEMA = """
+CREATE TABLE user_table (
+    user_id TEXT PRIMARY KEY,
+    username TEXT,
+    groups_joined TEXT,
+    interests TEXT,
+    blocked TEXT
+);
+CREATE TABLE group_table (
+    group_id TEXT PRIMARY KEY,
+    group_name TEXT,
+    private INTEGER DEFAULT 0,
+    banned TEXT,
+    group_interests TEXT
+);
+CREATE TABLE post (
+    guid TEXT PRIMARY KEY,
+    s3_url TEXT,
+    creation_date DATETIME,
+    poster_id TEXT,
+    group_id TEXT,
+    caption TEXT,
+    edited INTEGER,
+    comments TEXT,
+    likes TEXT,
+    dislikes TEXT,
+    views INTEGER DEFAULT 0,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    dislike_count INTEGER NOT NULL DEFAULT 0,
+    score REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE group_interest (
+    interest TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    PRIMARY KEY (interest, group_id)
+);
+CREATE INDEX idx_group_interest_group ON group_interest (group_id);
+CREATE TABLE user_feed (
+    user_id TEXT NOT NULL PRIMARY KEY,
+    version TEXT NOT NULL,
+    post_ids TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    built_at DATETIME NOT NULL
+);
+CREATE TABLE user_timeline (
+    user_id TEXT NOT NULL,
+    post_guid TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    creation_date DATETIME NOT NULL,
+    PRIMARY KEY (user_id, post_guid)
+);
+CREATE INDEX idx_user_timeline_recent ON user_timeline (user_id, creation_date);
+CREATE TABLE timeline_pull_group (
+    group_id TEXT NOT NULL PRIMARY KEY,
+    member_count INTEGER NOT NULL
+);
+CREATE TABLE user_block (
+    blocker_id TEXT NOT NULL,
+    blocked_id TEXT NOT NULL,
+    PRIMARY KEY (blocker_id, blocked_id)
+);
+CREATE INDEX idx_user_block_blocked ON user_block (blocked_id, blocker_id);
+CREATE TABLE group_member (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+CREATE INDEX idx_group_member_user ON group_member (user_id);
+CREATE TABLE group_ban (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+"""
+
+#secondary indexes on post, kept apart so bulk loads can build them once at the end
+POST_INDEXES = """
+-- 001_post_reaction_counters.sql
+CREATE INDEX idx_post_score ON post (score, creation_date);
+-- 008_post_date_index.sql
+CREATE INDEX idx_post_date ON post (creation_date);
+-- 005_post_owner_indexes.sql
+CREATE INDEX idx_post_poster_recent ON post (poster_id, creation_date, guid);
+-- 006_user_block_group_ban.sql widens the 005 index
+CREATE INDEX idx_post_group_recent ON post (group_id, creation_date, guid, poster_id);
+"""
+
+def open_database(path=":memory:", postIndexes=True):
+    """
+    Opens a sqlite database with the MySQL functions the handlers use and
+    creates the schema in it. Pass postIndexes=False before a bulk load and
+    call create_post_indexes() after it.
+    """
+    db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None, check_same_thread=False)
+    db.create_function("JSON_EXTRACT", 2, json_extract)
+    db.create_function("JSON_CONTAINS", -1, json_contains)
+    db.create_function("JSON_LENGTH", -1, json_length)
+    db.create_function("JSON_OBJECT", -1, json_object)
+    db.create_function("JSON_QUOTE", 1, json_quote)
+    db.create_function("JSON_VALID", 1, json_valid)
+    db.create_function("NOW", 0, _now)
+    db.create_function("UNIX_TIMESTAMP", 1, _unix_timestamp)
+    db.create_function("FROM_UNIXTIME", 1, _from_unixtime)
+    db.executescript(SCHEMA)
+    if postIndexes:
+        create_post_indexes(db)
+    return db
+
+def create_post_indexes(db):
+    db.executescript(POST_INDEXES)
+    db.execute("ANALYZE")
@@ -0,0 +1,92 @@
+"""
+Import-time profile of the Lambda handler modules, i.e. the part of a cold
+start spent before lambda_handler first runs.
+
+Each handler is imported in a fresh interpreter under `python -X importtime`
+so nothing is shared between runs. For each one it reports the total import
+time (median of --runs), the slowest modules it pulled in, and whether the
+heavy clients (boto3, pymysql) were loaded at import rather than on first use.
+
+Usage: python -m bench.import_profile [--handlers post_feed,posts_made] [--runs N] [--top N] [--json FILE]
+
+Run it from the repository root. Only modules that are actually installed
+are imported, so it works without pymysql or boto3 as well.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+#handler modules deployed as their own Lambda functions
+HANDLERS = ("post_feed", "posts_made", "post_comments", "timeline_fanout")
+
+#modules that should only be imported when the handler first needs them
+LAZY_MODULES = ("boto3", "botocore", "pymysql", "rds_config")
+
+def profile_import(moduleName):
+    """
+    Imports moduleName in a new interpreter and returns the -X importtime
+    entries as {module: (self microseconds, cumulative microseconds)}.
+    """
+    repoRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {moduleName}"],
+        cwd=repoRoot,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {moduleName} failed:\n{proc.stderr}")
+
+    # import time:  self [us] | cumulative | imported package
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        selfUs, cumulativeUs, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(selfUs), int(cumulativeUs))
+    return timings
+
+def profile_handler(moduleName, runs, top):
+    totals = []
+    for _ in range(runs):
+        timings = profile_import(moduleName)
+        totals.append(timings[moduleName][1])
+
+    # the slowest modules of the last run, by their own (not cumulative) time
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "handler": moduleName,
+        "runs": runs,
+        "import_ms": statistics.median(totals) / 1000,
+        "modules": len(timings),
+        "eager_clients": [name for name in LAZY_MODULES if name in timings],
+        "slowest": [{"module": name, "self_ms": selfUs / 1000, "cumulative_ms": cumulativeUs / 1000} for name, (selfUs, cumulativeUs) in slowest]
+    }
+
+def print_report(results):
+    for result in results:
+        eager = ", ".join(result["eager_clients"]) or "none"
+        print(f"{result['handler']}: {result['import_ms']:.1f} ms to import {result['modules']} modules (median of {result['runs']}), clients imported eagerly: {eager}")
+        for module in result["slowest"]:
+            print(f"    {module['self_ms']:>8.2f} ms self {module['cumulative_ms']:>8.2f} ms cumulative  {module['module']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the import time of the Lambda handler modules.")
+    parser.add_argument("--handlers", default=",".join(HANDLERS), help="comma separated handler modules to profile")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per handler")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules listed per handler")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = [profile_handler(moduleName, args.runs, args.top) for moduleName in args.handlers.split(",")]
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Offline benchmark of post_feed.lambda_handler and posts_made.lambda_handler.
+
+Both handlers run against bench/fake_rds.py loaded with a synthetic social
+graph (bench/synthetic.py) and a stub S3 signer, so no RDS or AWS access is
+needed. For each scale and request type it reports wall time, database
+round trips and rows transferred per request.
+
+Usage: python -m bench.run_bench [--posts 1000,100000,1000000] [--requests N] [--seed N] [--json FILE]
+
+pymysql and boto3 are only imported on first use, which the fake connection
+and stub signer never reach, so neither has to be installed. feedStore,
+viewWriteBehind and stageExecution are read from the environment like in
+production. Timelines are not pre-filled, so leave feedMode at pull.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import types
+
+from bench import fake_rds
+from bench.synthetic import SyntheticScale, generate
+
+def _use_local_config():
+    # the handlers only need rds_config and rdsHost to exist; every query goes to the fake
+    os.environ.setdefault('rdsHost', 'bench')
+    try:
+        import rds_config
+    except ImportError:
+        rdsConfig = types.ModuleType("rds_config")
+        rdsConfig.db_username = rdsConfig.db_password = rdsConfig.db_name = "bench"
+        sys.modules["rds_config"] = rdsConfig
+
+def stub_signer(bucket_name, object_name, expiration):
+    return f"https://{bucket_name}.s3.amazonaws.com/{object_name}?X-Amz-Expires={expiration}&X-Amz-Signature=bench"
+
+def _scenarios(rng, userIDs, groupIDs):
+    # (name, handler module name, query string parameters factory)
+    #group popularity is skewed toward the first IDs, so deep pages are requested from those
+    largeGroupIDs = groupIDs[:max(1, len(groupIDs) // 20)]
+    return (
+        ("feed page 1", "post_feed", lambda: {"userID": rng.choice(userIDs), "page": "1"}),
+        ("feed page 3", "post_feed", lambda: {"userID": rng.choice(userIDs), "page": "3"}),
+        ("feed page 1 reactions=counts", "post_feed", lambda: {"userID": rng.choice(userIDs), "page": "1", "reactions": "counts"}),
+        ("posts_made user", "posts_made", lambda: {"nameType": "user", "id": rng.choice(userIDs), "page": "1"}),
+        ("posts_made group", "posts_made", lambda: {"nameType": "group", "id": rng.choice(groupIDs), "page": "1"}),
+        ("posts_made group page 10", "posts_made", lambda: {"nameType": "group", "id": rng.choice(largeGroupIDs), "page": "10"})
+    )
+
+def _reset_caches(handlers):
+    # each scale starts cold, like a fresh container
+    import group_cache
+    import hydration
+    import interest_index
+    from feed_store import open_feed_store
+    from mix_db import get_connection
+
+    hydration.usernameCache.clear()
+    hydration.groupNameCache.clear()
+    group_cache.groupCache.clear()
+    interest_index.interestGroupCache.clear()
+    handlers["posts_made"].postCountCache.clear()
+    handlers["post_feed"].feedStore = open_feed_store(os.environ.get('feedStore', 'memory'), get_connection)
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_scale(handlers, postCount, requestCount, seed):
+    """
+    Generates a database with postCount posts and runs requestCount
+    requests of every scenario against it. Returns one result per scenario.
+    """
+    import mix_db
+
+    db = fake_rds.open_database(postIndexes=False)
+    stats = fake_rds.QueryStats()
+    scale = SyntheticScale(postCount)
+
+    started = time.perf_counter()
+    userIDs, groupIDs = generate(db, scale, seed)
+    fake_rds.create_post_indexes(db)
+    print(f"{postCount} posts: generated {scale.users} users and {scale.groups} groups in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    mix_db.set_connection(fake_rds.FakeConnection(db, stats))
+    handlers["post_feed"].stagePool = mix_db.ConnectionPool(handlers["post_feed"].STAGE_WORKERS, lambda: fake_rds.FakeConnection(db, stats))
+    _reset_caches(handlers)
+
+    rng = random.Random(seed)
+    results = []
+    for name, handlerName, makeParams in _scenarios(rng, userIDs, groupIDs):
+        handler = handlers[handlerName].lambda_handler
+        wallTimes = []
+        roundTrips = []
+        rows = []
+        statusCodes = {}
+        for _ in range(requestCount):
+            event = {"queryStringParameters": makeParams()}
+            stats.reset()
+            with contextlib.redirect_stdout(io.StringIO()):
+                requestStarted = time.perf_counter()
+                response = handler(event, None)
+                wallTimes.append(time.perf_counter() - requestStarted)
+            roundTrips.append(stats.roundTrips)
+            rows.append(stats.rows)
+            statusCodes[response['statusCode']] = statusCodes.get(response['statusCode'], 0) + 1
+
+        results.append({
+            "posts": postCount,
+            "scenario": name,
+            "requests": requestCount,
+            "p50_ms": statistics.median(wallTimes) * 1000,
+            "p95_ms": _percentile(wallTimes, 0.95) * 1000,
+            "round_trips": statistics.mean(roundTrips),
+            "rows": statistics.mean(rows),
+            "status_codes": statusCodes
+        })
+
+    db.close()
+    return results
+
+def print_report(results):
+    print(f"{'posts':>9}  {'scenario':<30} {'p50 ms':>9} {'p95 ms':>9} {'round trips':>12} {'rows':>10}  status codes")
+    for result in results:
+        statusCodes = ", ".join(f"{code}x{count}" for code, count in sorted(result["status_codes"].items()))
+        print(f"{result['posts']:>9}  {result['scenario']:<30} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['round_trips']:>12.1f} {result['rows']:>10.1f}  {statusCodes}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the feed handlers against a local fake RDS.")
+    parser.add_argument("--posts", default="1000,100000,1000000", help="comma separated post counts, one run per scale")
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario and scale")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    _use_local_config()
+
+    import post_feed
+    import posts_made
+    import s3_presign
+
+    s3_presign.presignedUrls.signer = stub_signer
+    handlers = {"post_feed": post_feed, "posts_made": posts_made}
+
+    results = []
+    for postCount in (int(posts) for posts in args.posts.split(",")):
+        results.extend(run_scale(handlers, postCount, args.requests, args.seed))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
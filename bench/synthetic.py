@@ -0,0 +1,138 @@
+"""
+Synthetic social graph for the benchmark suite: users with joined groups,
+interests and block lists, groups with interests and ban lists, and posts
+with likes, dislikes and comments. Popularity is skewed so a few groups and
+posts get most of the members and reactions, like in production. Joined
+groups, block lists and ban lists are also written to group_member,
+user_block and group_ban, as the migrations/006 and 007 triggers would.
+"""
+import datetime
+import json
+import random
+
+from post_ranking import ranking_score
+
+INTERESTS = (
+    "art", "music", "games", "food", "code", "film", "books", "travel", "fitness", "fashion",
+    "science", "history", "pets", "cars", "photography", "anime", "sports", "design", "finance", "politics",
+    "comedy", "diy", "gardening", "space", "theatre", "dance", "crypto", "cooking", "hiking", "memes"
+)
+
+#posts are spread over this many days before now
+POST_HISTORY_DAYS = 60
+
+#rows per executemany while loading
+INSERT_BATCH_SIZE = 10000
+
+class SyntheticScale:
+    """
+    How many rows of each kind to generate for a given number of posts.
+    """
+
+    def __init__(self, posts, postsPerUser=20, postsPerGroup=200):
+        self.posts = posts
+        self.users = max(50, posts // postsPerUser)
+        self.groups = max(10, posts // postsPerGroup)
+
+def _skewed_picker(rng, count):
+    # Zipf-like: the item at rank r is picked in proportion to 1 / (r + 1)
+    cumWeights = []
+    total = 0.0
+    for rank in range(count):
+        total += 1.0 / (rank + 1)
+        cumWeights.append(total)
+    population = range(count)
+    return lambda k=1: rng.choices(population, cum_weights=cumWeights, k=k)
+
+def _heavy_tail(rng, cap):
+    # mostly small counts with the occasional very large one
+    return min(cap, int(rng.paretovariate(1.2)) - 1)
+
+def generate(db, scale, seed=1, now=None):
+    """
+    Fills an empty fake_rds database with scale.posts posts and the users
+    and groups around them, including the derived reaction counters and
+    group_interest rows. Returns the generated user and group IDs.
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.datetime.now()).replace(microsecond=0)
+
+    userIDs = [f"user-{i:07d}" for i in range(scale.users)]
+    groupIDs = [f"group-{i:06d}" for i in range(scale.groups)]
+    pickGroup = _skewed_picker(rng, scale.groups)
+    pickUser = _skewed_picker(rng, scale.users)
+
+    groupRows = []
+    groupInterestRows = []
+    groupBanRows = []
+    for groupID in groupIDs:
+        interests = rng.sample(INTERESTS, rng.randint(1, 3))
+        banned = None
+        if rng.random() < 0.2:
+            bannedIDs = [userIDs[i] for i in pickUser(rng.randint(1, 5))]
+            banned = json.dumps({"banned": [{"userID": userID} for userID in bannedIDs]})
+            groupBanRows.extend((groupID, userID) for userID in bannedIDs)
+        groupRows.append((groupID, "Group " + groupID, 1 if rng.random() < 0.15 else 0, banned, json.dumps({"group_interests": interests})))
+        groupInterestRows.extend((interest, groupID) for interest in interests)
+    db.executemany("INSERT INTO group_table VALUES (?, ?, ?, ?, ?)", groupRows)
+    db.executemany("INSERT OR IGNORE INTO group_interest VALUES (?, ?)", groupInterestRows)
+    db.executemany("INSERT OR IGNORE INTO group_ban VALUES (?, ?)", groupBanRows)
+
+    joinedGroups = {}
+    userRows = []
+    userBlockRows = []
+    for userID in userIDs:
+        joined = sorted({groupIDs[i] for i in pickGroup(rng.randint(3, 10))})
+        joinedGroups[userID] = joined
+        blocked = None
+        if rng.random() < 0.1:
+            blockedIDs = [userIDs[rng.randrange(scale.users)] for _ in range(rng.randint(1, 10))]
+            blocked = json.dumps(blockedIDs)
+            userBlockRows.extend((userID, blockedID) for blockedID in blockedIDs)
+        interests = json.dumps({"interests": rng.sample(INTERESTS, rng.randint(2, 4))})
+        userRows.append((userID, "name-" + userID, json.dumps({"groups": joined}), interests, blocked))
+    db.executemany("INSERT INTO user_table VALUES (?, ?, ?, ?, ?)", userRows)
+    db.executemany("INSERT OR IGNORE INTO user_block VALUES (?, ?)", userBlockRows)
+    db.executemany("INSERT INTO group_member VALUES (?, ?)", [(groupID, userID) for userID, joined in joinedGroups.items() for groupID in joined])
+
+    historySeconds = POST_HISTORY_DAYS * 86400
+    postRows = []
+    for i in range(scale.posts):
+        posterID = userIDs[rng.randrange(scale.users)]
+        groupID = rng.choice(joinedGroups[posterID]) if rng.random() < 0.9 else groupIDs[pickGroup()[0]]
+
+        likes = {userIDs[j] for j in pickUser(_heavy_tail(rng, 5000))}
+        dislikes = {userIDs[j] for j in pickUser(_heavy_tail(rng, 1000))}
+        comments = [{"text": f"comment {c} on post {i}", "username": userIDs[rng.randrange(scale.users)]} for c in range(_heavy_tail(rng, 2000))]
+
+        urlKind = rng.random()
+        if urlKind < 0.6:
+            s3URL = f"s3://mixbucket/posts/{i}.jpg"
+        elif urlKind < 0.9:
+            s3URL = None
+        else:
+            s3URL = f"https://cdn.example.com/{i}.jpg"
+
+        postRows.append((
+            "%032x" % rng.getrandbits(128),
+            s3URL,
+            now - datetime.timedelta(seconds=rng.randrange(historySeconds)),
+            posterID,
+            groupID,
+            f"caption {i}",
+            0,
+            json.dumps({"comments": comments}) if comments else None,
+            json.dumps({"likes": sorted(likes)}) if likes else None,
+            json.dumps({"dislikes": sorted(dislikes)}) if dislikes else None,
+            rng.randrange(1000),
+            len(likes),
+            len(dislikes),
+            ranking_score(len(likes), len(dislikes))
+        ))
+
+        if len(postRows) >= INSERT_BATCH_SIZE:
+            db.executemany("INSERT INTO post VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", postRows)
+            postRows = []
+    db.executemany("INSERT INTO post VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", postRows)
+
+    return userIDs, groupIDs
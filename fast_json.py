@@ -0,0 +1,22 @@
+import json
+
+#orjson is optional; without it everything goes through the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(value):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+def dumps(value):
+    """
+    Serializes a response body to a str. Anything the backend cannot encode
+    natively (datetimes, Decimals) is written with str(), the same as
+    json.dumps(value, default=str).
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+    return json.dumps(value, default=str)
@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import threading
+import time
+
+import queries
+from mix_db import execute, fetch_one
+from ttl_cache import TTLCache
+
+#seconds a materialized feed is served before it is rebuilt. Nothing invalidates feeds when a post is
+#created, so in feedMode=pull new posts reach a feed that is already stored only once it expires
+FEED_TTL = 300
+
+#materialized feeds kept per container by the memory store; the least recently read are dropped first
+FEED_STORE_SIZE = 2000
+
+class FeedEntry:
+    """
+    One user's materialized feed: post GUIDs in feed order, the viewer
+    version stamp they were built for, and whether the list holds the whole
+    feed or only its first posts.
+    """
+
+    __slots__ = ("version", "postIDs", "complete", "builtAt")
+
+    def __init__(self, version, postIDs, complete, builtAt=None):
+        self.version = version
+        self.postIDs = list(postIDs)
+        self.complete = complete
+        self.builtAt = time.time() if builtAt is None else builtAt
+
+    def is_fresh(self, version, now=None):
+        if now is None:
+            now = time.time()
+        return self.version == version and now - self.builtAt < FEED_TTL
+
+    def covers(self, count):
+        return self.complete or len(self.postIDs) >= count
+
+class InProcessFeedStore:
+    """
+    Feeds kept in this container's memory, at most maxsize of them, each
+    for FEED_TTL seconds. Used by default.
+    """
+
+    def __init__(self, maxsize=FEED_STORE_SIZE):
+        self._entries = TTLCache(maxsize, FEED_TTL)
+
+    def get(self, userID):
+        return self._entries.get(userID)
+
+    def put(self, userID, entry):
+        self._entries.put(userID, entry)
+
+    def invalidate(self, userID):
+        self._entries.invalidate(userID)
+
+    def invalidate_many(self, userIDs):
+        for userID in userIDs:
+            self.invalidate(userID)
+
+    def __len__(self):
+        return len(self._entries)
+
+class SqliteFeedStore:
+    """
+    Feeds kept in a local sqlite file, for running the handler offline.
+    """
+
+    def __init__(self, path=":memory:"):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS user_feed (user_id TEXT PRIMARY KEY, version TEXT, post_ids TEXT, complete INTEGER, built_at REAL)")
+
+    def get(self, userID):
+        with self._lock:
+            row = self._db.execute("SELECT version, post_ids, complete, built_at FROM user_feed WHERE user_id = ?", (str(userID),)).fetchone()
+        if row is None:
+            return None
+        return FeedEntry(row[0], json.loads(row[1]), bool(row[2]), row[3])
+
+    def put(self, userID, entry):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO user_feed VALUES (?, ?, ?, ?, ?)", (str(userID), entry.version, json.dumps(entry.postIDs, default=str), int(entry.complete), entry.builtAt))
+            self._db.commit()
+
+    def invalidate(self, userID):
+        self.invalidate_many([userID])
+
+    def invalidate_many(self, userIDs):
+        with self._lock:
+            self._db.executemany("DELETE FROM user_feed WHERE user_id = ?", [(str(userID),) for userID in userIDs])
+            self._db.commit()
+
+class MySQLFeedStore:
+    """
+    Feeds kept in the user_feed table (migrations/003_user_feed.sql) so
+    every container shares them. getConnection is normally
+    mix_db.get_connection.
+    """
+
+    def __init__(self, getConnection):
+        self.getConnection = getConnection
+
+    def get(self, userID):
+        row = fetch_one(self.getConnection(), queries.FEED_ENTRY, userID)
+        if row is None:
+            return None
+        return FeedEntry(row[0], json.loads(row[1]), bool(row[2]), float(row[3]))
+
+    def put(self, userID, entry):
+        execute(self.getConnection(), queries.SAVE_FEED_ENTRY, (userID, entry.version, json.dumps(entry.postIDs, default=str), int(entry.complete), entry.builtAt))
+
+    def invalidate(self, userID):
+        self.invalidate_many([userID])
+
+    def invalidate_many(self, userIDs):
+        userIDs = list(userIDs)
+        if not userIDs:
+            return
+        execute(self.getConnection(), queries.with_in_list(queries.DELETE_FEED_ENTRIES, len(userIDs)), userIDs)
+
+def open_feed_store(kind, getConnection):
+    """
+    Picks a store by name: "memory" (default), "sqlite[:path]" or "mysql".
+    """
+    if kind == "mysql":
+        return MySQLFeedStore(getConnection)
+    if kind.startswith("sqlite"):
+        path = kind.partition(":")[2] or ":memory:"
+        return SqliteFeedStore(path)
+    return InProcessFeedStore()
@@ -0,0 +1,75 @@
+import queries
+from mix_db import fetch_all
+from ttl_cache import TTLCache
+
+#group metadata kept per container; privacy and ban changes show up within GROUP_CACHE_TTL seconds at worst
+GROUP_CACHE_SIZE = 5000
+GROUP_CACHE_TTL = 30
+
+groupCache = TTLCache(GROUP_CACHE_SIZE, GROUP_CACHE_TTL)
+
+_MISSING = object()
+
+class GroupMeta:
+    """
+    Existence, privacy and ban list of one group. A group that does not
+    exist is cached as None so repeated lookups stay off the database too.
+    Bans are read from the group_ban table, not the group_table.banned JSON.
+    """
+
+    __slots__ = ("groupID", "private", "banned")
+
+    def __init__(self, groupID, private, banned):
+        self.groupID = groupID
+        self.private = private
+        self.banned = banned
+
+def load_groups(conn, groupIDs):
+    """
+    Returns {groupID: GroupMeta or None} for every ID given, loading all
+    groups that are not cached in a single query.
+    """
+    groups = {}
+    missing = []
+    for groupID in set(groupIDs):
+        meta = groupCache.get(groupID, _MISSING)
+        if meta is _MISSING:
+            missing.append(groupID)
+        else:
+            groups[groupID] = meta
+
+    if missing:
+        private = {}
+        banned = {}
+        for groupID, groupPrivate, bannedUser in fetch_all(conn, queries.with_in_list(queries.GROUP_METADATA, len(missing)), missing):
+            private[groupID] = groupPrivate != 0
+            if bannedUser is not None:
+                banned.setdefault(groupID, set()).add(bannedUser)
+
+        for groupID in missing:
+            meta = None
+            if groupID in private:
+                meta = GroupMeta(groupID, private[groupID], frozenset(banned.get(groupID, ())))
+            groupCache.put(groupID, meta)
+            groups[groupID] = meta
+
+    return groups
+
+def get_group(conn, groupID):
+    return load_groups(conn, [groupID])[groupID]
+
+def group_exists(conn, groupID):
+    return get_group(conn, groupID) is not None
+
+def is_banned(conn, userID, groupID):
+    meta = get_group(conn, groupID)
+    return meta is not None and userID in meta.banned
+
+def is_private_to(conn, groupID, joinedGroups):
+    # private groups are only shown to their members
+    meta = get_group(conn, groupID)
+    return meta is not None and meta.private and groupID not in joinedGroups
+
+def invalidate_group(groupID):
+    # call after a group's privacy or ban list changes
+    groupCache.invalidate(groupID)
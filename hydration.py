@@ -0,0 +1,71 @@
+import queries
+from mix_db import fetch_all
+from post_record import PostRecord
+from ttl_cache import TTLCache
+
+#display names kept per container; renames show up within HYDRATION_CACHE_TTL seconds at worst
+HYDRATION_CACHE_SIZE = 10000
+HYDRATION_CACHE_TTL = 300
+
+usernameCache = TTLCache(HYDRATION_CACHE_SIZE, HYDRATION_CACHE_TTL)
+groupNameCache = TTLCache(HYDRATION_CACHE_SIZE, HYDRATION_CACHE_TTL)
+
+_MISSING = object()
+
+def _resolve(conn, cache, query, ids):
+    names = {}
+    missing = []
+    for id in set(ids):
+        name = cache.get(id, _MISSING)
+        if name is _MISSING:
+            missing.append(id)
+        else:
+            names[id] = name
+
+    if missing:
+        for id, name in fetch_all(conn, queries.with_in_list(query, len(missing)), missing):
+            cache.put(id, name)
+            names[id] = name
+
+    return names
+
+def resolve_usernames(conn, userIDs):
+    """
+    Maps each user ID to its username with at most one query for all IDs
+    not already cached. Unknown IDs are left out of the result.
+    """
+    return _resolve(conn, usernameCache, queries.USERNAMES, userIDs)
+
+def resolve_group_names(conn, groupIDs):
+    """
+    Maps each group ID to its group name with at most one query for all
+    IDs not already cached. Unknown IDs are left out of the result.
+    """
+    return _resolve(conn, groupNameCache, queries.GROUP_NAMES, groupIDs)
+
+def load_posts(conn, postIDs, reactionCounts=False, viewerID=None):
+    """
+    Loads the full post rows, blobs included, for the given GUIDs in one
+    query and returns them as PostRecords in the same order. Missing posts
+    are left out. With reactionCounts the liker lists are not read; each
+    post carries its like/dislike counts and viewerID's reaction instead.
+    """
+    if not postIDs:
+        return []
+
+    if reactionCounts:
+        query = queries.with_in_list(queries.POSTS_BY_GUID_WITH_REACTION_COUNTS, len(postIDs))
+        rows = fetch_all(conn, query, (viewerID, viewerID, *postIDs))
+    else:
+        rows = fetch_all(conn, queries.with_in_list(queries.POSTS_BY_GUID, len(postIDs)), postIDs)
+
+    postsByID = {row[0]: PostRecord(row, reactionCounts) for row in rows}
+    return [postsByID[postID] for postID in postIDs if postID in postsByID]
+
+def invalidate_user(userID):
+    # call after a username change so this container stops serving the old name
+    usernameCache.invalidate(userID)
+
+def invalidate_group(groupID):
+    # call after a group rename so this container stops serving the old name
+    groupNameCache.invalidate(groupID)
@@ -0,0 +1,127 @@
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import fast_json
+
+logger = logging.getLogger()
+
+#full result dumps are only logged at DEBUG level, and then only for this fraction of invocations
+DEBUG_SAMPLE_RATE = float(os.environ.get('debugSampleRate', '0.01'))
+
+class RequestMetrics:
+    """
+    Stage timings and SQL accounting for one invocation. Stages that run
+    more than once (or on several threads) add up under the same name.
+    """
+
+    def __init__(self, handlerName, coldStart, sampled):
+        self.handlerName = handlerName
+        self.coldStart = coldStart
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.queries = 0
+        self.rows = 0
+        self.fields = {}
+        self._lock = threading.Lock()
+
+    def add_stage_time(self, name, elapsed):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def add_query(self, rows):
+        with self._lock:
+            self.queries += 1
+            self.rows += rows
+
+    def summary(self, statusCode):
+        summary = {
+            "handler": self.handlerName,
+            "statusCode": statusCode,
+            "coldStart": self.coldStart,
+            "durationMs": round((time.perf_counter() - self.started) * 1000, 2),
+            "queries": self.queries,
+            "rows": self.rows,
+            "stagesMs": {name: round(elapsed * 1000, 2) for name, elapsed in self.stages.items()}
+        }
+        summary.update(self.fields)
+        return summary
+
+#metrics of the invocation in progress; Lambda runs one invocation per container at a time
+_current = None
+_coldStart = True
+
+def instrumented(handlerName):
+    """
+    Decorates a lambda_handler so every invocation logs one summary line
+    with its status code, duration, stage timings, queries and rows.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _current, _coldStart
+            sampled = logger.isEnabledFor(logging.DEBUG) and random.random() < DEBUG_SAMPLE_RATE
+            metrics = RequestMetrics(handlerName, _coldStart, sampled)
+            _current = metrics
+            _coldStart = False
+
+            statusCode = 500
+            try:
+                response = handler(event, context)
+                statusCode = response['statusCode']
+                return response
+            finally:
+                _current = None
+                logger.info(fast_json.dumps(metrics.summary(statusCode)))
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage(name):
+    metrics = _current
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.add_stage_time(name, time.perf_counter() - started)
+
+def timed(name, iterable):
+    # times a lazy stage: only the work done producing items is counted, not the consumer's
+    metrics = _current
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            if metrics is not None:
+                metrics.add_stage_time(name, time.perf_counter() - started)
+        yield item
+
+def record_query(rows):
+    metrics = _current
+    if metrics is not None:
+        metrics.add_query(rows)
+
+def annotate(**fields):
+    # extra fields for this invocation's summary line
+    metrics = _current
+    if metrics is not None:
+        metrics.fields.update(fields)
+
+def debug_dump(label, value):
+    """
+    Logs a full value (result sets, rendered pages) for sampled invocations
+    at DEBUG level only. The value is not formatted otherwise.
+    """
+    metrics = _current
+    if metrics is not None and metrics.sampled:
+        logger.debug(f"{label}: {value}")
@@ -0,0 +1,68 @@
+import json
+
+import queries
+from mix_db import execute, execute_many, fetch_all
+from ttl_cache import TTLCache
+
+#interest -> group IDs kept per container; only missing or expired interests are re-queried
+INTEREST_CACHE_SIZE = 5000
+INTEREST_CACHE_TTL = 300
+
+interestGroupCache = TTLCache(INTEREST_CACHE_SIZE, INTEREST_CACHE_TTL)
+
+def parse_group_interests(groupInterestsJson):
+    if groupInterestsJson is None or groupInterestsJson == "null":
+        return []
+
+    groupInterests = json.loads(groupInterestsJson)
+    if groupInterests is None:
+        return []
+    return groupInterests["group_interests"]
+
+def groups_for_interests(conn, interests):
+    """
+    Returns the IDs of groups sharing any of the given interests, in
+    interest order and without repeats. Interests that are not cached are
+    resolved together in one query against the group_interest index.
+    """
+    interestGroups = {}
+    missing = []
+    for interest in set(interests):
+        groupIDs = interestGroupCache.get(interest)
+        if groupIDs is None:
+            missing.append(interest)
+        else:
+            interestGroups[interest] = groupIDs
+
+    if missing:
+        found = {interest: [] for interest in missing}
+        for interest, groupID in fetch_all(conn, queries.with_in_list(queries.INTEREST_GROUPS, len(missing)), missing):
+            found[interest].append(groupID)
+
+        for interest, groupIDs in found.items():
+            groupIDs = tuple(groupIDs)
+            interestGroupCache.put(interest, groupIDs)
+            interestGroups[interest] = groupIDs
+
+    groups = []
+    seenGroups = set()
+    for interest in interests:
+        for groupID in interestGroups[interest]:
+            if groupID not in seenGroups:
+                seenGroups.add(groupID)
+                groups.append(groupID)
+    return groups
+
+def sync_group_interests(conn, groupID, interests):
+    """
+    Rewrites a group's rows in group_interest. The table triggers already do
+    this for writes to group_table; this is for callers that bypass them.
+    Cached lookups of both the old and the new interests are dropped.
+    """
+    previousInterests = [result[0] for result in fetch_all(conn, queries.GROUP_INTERESTS, groupID)]
+    execute(conn, queries.DELETE_GROUP_INTERESTS, groupID)
+    if interests:
+        execute_many(conn, queries.INSERT_GROUP_INTEREST, [(interest, groupID) for interest in interests])
+
+    for interest in set(previousInterests) | set(interests):
+        interestGroupCache.invalidate(interest)
@@ -0,0 +1,41 @@
+-- Denormalized reaction counters and ranking score for post.
+-- The feed's global fallback stage orders by score through idx_post_score
+-- instead of parsing every post's likes/dislikes JSON in Python.
+-- Run migrations/backfill_post_counters.py once after applying this.
+
+ALTER TABLE post
+    ADD COLUMN like_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN dislike_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN score DOUBLE NOT NULL DEFAULT 0;
+
+CREATE INDEX idx_post_score ON post (score, creation_date);
+
+-- Keep the counters in step with every write to likes/dislikes, whichever
+-- service makes it. score matches the old calculate_ratio(): likes when
+-- there are no dislikes, likes / dislikes otherwise. The division is done
+-- in floating point (* 1e0) so it stores the same double as
+-- post_ranking.ranking_score in the backfill; INT / INT would give a
+-- DECIMAL rounded to div_precision_increment places.
+DELIMITER //
+
+CREATE TRIGGER post_reaction_counters_insert BEFORE INSERT ON post
+FOR EACH ROW
+BEGIN
+    SET NEW.like_count = IF(JSON_VALID(NEW.likes), COALESCE(JSON_LENGTH(NEW.likes, '$."likes"'), 0), 0);
+    SET NEW.dislike_count = IF(JSON_VALID(NEW.dislikes), COALESCE(JSON_LENGTH(NEW.dislikes, '$."dislikes"'), 0), 0);
+    SET NEW.score = IF(NEW.dislike_count = 0, NEW.like_count, NEW.like_count / (NEW.dislike_count * 1e0));
+END//
+
+-- Updates that leave likes and dislikes alone (views, captions, comments)
+-- skip the recount, and so do the backfill's explicit counter updates.
+CREATE TRIGGER post_reaction_counters_update BEFORE UPDATE ON post
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.likes <=> OLD.likes) OR NOT (NEW.dislikes <=> OLD.dislikes) THEN
+        SET NEW.like_count = IF(JSON_VALID(NEW.likes), COALESCE(JSON_LENGTH(NEW.likes, '$."likes"'), 0), 0);
+        SET NEW.dislike_count = IF(JSON_VALID(NEW.dislikes), COALESCE(JSON_LENGTH(NEW.dislikes, '$."dislikes"'), 0), 0);
+        SET NEW.score = IF(NEW.dislike_count = 0, NEW.like_count, NEW.like_count / (NEW.dislike_count * 1e0));
+    END IF;
+END//
+
+DELIMITER ;
@@ -0,0 +1,46 @@
+-- Normalized interest -> group index. The feed's recommendation stage
+-- resolves all of a user's interests with one indexed lookup here instead
+-- of a JSON_CONTAINS scan of group_table per interest.
+-- Run migrations/backfill_group_interest.py once after applying this.
+
+-- group_id must match the type of group_table.group_id
+CREATE TABLE group_interest (
+    interest VARCHAR(255) NOT NULL,
+    group_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (interest, group_id),
+    KEY idx_group_interest_group (group_id)
+);
+
+-- Keep the index in step with group_table.group_interests on every write.
+DELIMITER //
+
+CREATE TRIGGER group_interest_sync_insert AFTER INSERT ON group_table
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO group_interest (interest, group_id)
+    SELECT jt.interest, NEW.group_id
+    FROM JSON_TABLE(IF(JSON_VALID(NEW.group_interests), NEW.group_interests, '{}'), '$."group_interests"[*]'
+        COLUMNS (interest VARCHAR(255) PATH '$')) jt
+    WHERE jt.interest IS NOT NULL;
+END//
+
+CREATE TRIGGER group_interest_sync_update AFTER UPDATE ON group_table
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.group_interests <=> OLD.group_interests) OR NEW.group_id <> OLD.group_id THEN
+        DELETE FROM group_interest WHERE group_id = OLD.group_id;
+        INSERT IGNORE INTO group_interest (interest, group_id)
+        SELECT jt.interest, NEW.group_id
+        FROM JSON_TABLE(IF(JSON_VALID(NEW.group_interests), NEW.group_interests, '{}'), '$."group_interests"[*]'
+            COLUMNS (interest VARCHAR(255) PATH '$')) jt
+        WHERE jt.interest IS NOT NULL;
+    END IF;
+END//
+
+CREATE TRIGGER group_interest_sync_delete AFTER DELETE ON group_table
+FOR EACH ROW
+BEGIN
+    DELETE FROM group_interest WHERE group_id = OLD.group_id;
+END//
+
+DELIMITER ;
@@ -0,0 +1,12 @@
+-- Materialized per-user feeds for feedStore=mysql. post_ids holds the
+-- feed's post GUIDs in order; version is the viewer stamp (joined groups,
+-- interests and block list) the list was built for.
+
+-- user_id must match the type of user_table.user_id
+CREATE TABLE user_feed (
+    user_id VARCHAR(255) NOT NULL PRIMARY KEY,
+    version CHAR(40) NOT NULL,
+    post_ids JSON NOT NULL,
+    complete TINYINT(1) NOT NULL DEFAULT 0,
+    built_at DATETIME NOT NULL
+);
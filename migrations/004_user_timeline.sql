@@ -0,0 +1,21 @@
+-- Fan-out-on-write timelines for feedMode=fanout. Each new post's GUID is
+-- copied to every member of its group (timeline_fanout.py); the feed then
+-- reads the viewer's joined-group posts from user_timeline in one range
+-- scan. Groups too large to fan out are listed in timeline_pull_group and
+-- are still read with pull-on-read.
+
+-- user_id/group_id/post_guid must match the types of user_table.user_id,
+-- group_table.group_id and post.guid
+CREATE TABLE user_timeline (
+    user_id VARCHAR(255) NOT NULL,
+    post_guid VARCHAR(255) NOT NULL,
+    group_id VARCHAR(255) NOT NULL,
+    creation_date DATETIME NOT NULL,
+    PRIMARY KEY (user_id, post_guid),
+    KEY idx_user_timeline_recent (user_id, creation_date)
+);
+
+CREATE TABLE timeline_pull_group (
+    group_id VARCHAR(255) NOT NULL PRIMARY KEY,
+    member_count INT NOT NULL
+);
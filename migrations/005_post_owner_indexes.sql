@@ -0,0 +1,8 @@
+-- Indexes behind posts_made's paging. Each page of a user's or group's
+-- posts is read with LIMIT/OFFSET or a (creation_date, guid) keyset cursor
+-- straight off one of these, and the post counts for numPages are counted
+-- from them without touching the rows.
+
+CREATE INDEX idx_post_poster_recent ON post (poster_id, creation_date, guid);
+
+CREATE INDEX idx_post_group_recent ON post (group_id, creation_date, guid);
@@ -0,0 +1,91 @@
+-- Normalized block and ban relations. Feed and posts_made candidate
+-- queries leave out blocked and banned posters with NOT EXISTS anti-joins
+-- on these primary keys instead of reading and parsing the
+-- user_table.blocked and group_table.banned JSON of every row they touch.
+-- The JSON columns stay the source of truth; the triggers below copy every
+-- write to them into these tables, whichever service makes it.
+-- Run migrations/backfill_user_block_group_ban.py once after applying this.
+
+-- blocker_id/blocked_id/user_id must match the type of user_table.user_id,
+-- group_id the type of group_table.group_id
+CREATE TABLE user_block (
+    blocker_id VARCHAR(255) NOT NULL,
+    blocked_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (blocker_id, blocked_id),
+    KEY idx_user_block_blocked (blocked_id, blocker_id)
+);
+
+CREATE TABLE group_ban (
+    group_id VARCHAR(255) NOT NULL,
+    user_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+
+-- Lets the group posts_made queries check bans from the index alone.
+ALTER TABLE post
+    DROP INDEX idx_post_group_recent,
+    ADD INDEX idx_post_group_recent (group_id, creation_date, guid, poster_id);
+
+-- user_table.blocked is a JSON array of user IDs,
+-- group_table.banned is {"banned": [{"userID": ...}, ...]}.
+DELIMITER //
+
+CREATE TRIGGER user_block_sync_insert AFTER INSERT ON user_table
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO user_block (blocker_id, blocked_id)
+    SELECT NEW.user_id, jt.blocked_id
+    FROM JSON_TABLE(IF(JSON_VALID(NEW.blocked), NEW.blocked, '[]'), '$[*]'
+        COLUMNS (blocked_id VARCHAR(255) PATH '$')) jt
+    WHERE jt.blocked_id IS NOT NULL;
+END//
+
+CREATE TRIGGER user_block_sync_update AFTER UPDATE ON user_table
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.blocked <=> OLD.blocked) OR NEW.user_id <> OLD.user_id THEN
+        DELETE FROM user_block WHERE blocker_id = OLD.user_id;
+        INSERT IGNORE INTO user_block (blocker_id, blocked_id)
+        SELECT NEW.user_id, jt.blocked_id
+        FROM JSON_TABLE(IF(JSON_VALID(NEW.blocked), NEW.blocked, '[]'), '$[*]'
+            COLUMNS (blocked_id VARCHAR(255) PATH '$')) jt
+        WHERE jt.blocked_id IS NOT NULL;
+    END IF;
+END//
+
+CREATE TRIGGER user_block_sync_delete AFTER DELETE ON user_table
+FOR EACH ROW
+BEGIN
+    DELETE FROM user_block WHERE blocker_id = OLD.user_id;
+END//
+
+CREATE TRIGGER group_ban_sync_insert AFTER INSERT ON group_table
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO group_ban (group_id, user_id)
+    SELECT NEW.group_id, jt.user_id
+    FROM JSON_TABLE(IF(JSON_VALID(NEW.banned), NEW.banned, '{}'), '$."banned"[*]'
+        COLUMNS (user_id VARCHAR(255) PATH '$."userID"')) jt
+    WHERE jt.user_id IS NOT NULL;
+END//
+
+CREATE TRIGGER group_ban_sync_update AFTER UPDATE ON group_table
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.banned <=> OLD.banned) OR NEW.group_id <> OLD.group_id THEN
+        DELETE FROM group_ban WHERE group_id = OLD.group_id;
+        INSERT IGNORE INTO group_ban (group_id, user_id)
+        SELECT NEW.group_id, jt.user_id
+        FROM JSON_TABLE(IF(JSON_VALID(NEW.banned), NEW.banned, '{}'), '$."banned"[*]'
+            COLUMNS (user_id VARCHAR(255) PATH '$."userID"')) jt
+        WHERE jt.user_id IS NOT NULL;
+    END IF;
+END//
+
+CREATE TRIGGER group_ban_sync_delete AFTER DELETE ON group_table
+FOR EACH ROW
+BEGIN
+    DELETE FROM group_ban WHERE group_id = OLD.group_id;
+END//
+
+DELIMITER ;
@@ -0,0 +1,49 @@
+-- Normalized group membership for timeline_fanout.py. Fanning out a new
+-- post reads its group's members with one range scan of the primary key
+-- here instead of a JSON_CONTAINS scan of every user_table row.
+-- user_table.groups_joined stays the source of truth; the triggers below
+-- copy every write to it into this table.
+-- Run migrations/backfill_group_member.py once after applying this.
+
+-- group_id/user_id must match the types of group_table.group_id and
+-- user_table.user_id
+CREATE TABLE group_member (
+    group_id VARCHAR(255) NOT NULL,
+    user_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (group_id, user_id),
+    KEY idx_group_member_user (user_id)
+);
+
+-- user_table.groups_joined is {"groups": [group IDs]}.
+DELIMITER //
+
+CREATE TRIGGER group_member_sync_insert AFTER INSERT ON user_table
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO group_member (group_id, user_id)
+    SELECT jt.group_id, NEW.user_id
+    FROM JSON_TABLE(IF(JSON_VALID(NEW.groups_joined), NEW.groups_joined, '{}'), '$."groups"[*]'
+        COLUMNS (group_id VARCHAR(255) PATH '$')) jt
+    WHERE jt.group_id IS NOT NULL;
+END//
+
+CREATE TRIGGER group_member_sync_update AFTER UPDATE ON user_table
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.groups_joined <=> OLD.groups_joined) OR NEW.user_id <> OLD.user_id THEN
+        DELETE FROM group_member WHERE user_id = OLD.user_id;
+        INSERT IGNORE INTO group_member (group_id, user_id)
+        SELECT jt.group_id, NEW.user_id
+        FROM JSON_TABLE(IF(JSON_VALID(NEW.groups_joined), NEW.groups_joined, '{}'), '$."groups"[*]'
+            COLUMNS (group_id VARCHAR(255) PATH '$')) jt
+        WHERE jt.group_id IS NOT NULL;
+    END IF;
+END//
+
+CREATE TRIGGER group_member_sync_delete AFTER DELETE ON user_table
+FOR EACH ROW
+BEGIN
+    DELETE FROM group_member WHERE user_id = OLD.user_id;
+END//
+
+DELIMITER ;
@@ -0,0 +1,6 @@
+-- Index behind the feed's recent global tiers (queries.RECENT_POST_WINDOW).
+-- The newest posts of the past 7 or 30 days are read backwards off it and
+-- the scan stops once the tier's limit of visible posts is reached, instead
+-- of sorting every post in the window.
+
+CREATE INDEX idx_post_date ON post (creation_date);
@@ -0,0 +1,68 @@
+"""
+Shared pieces of the one-shot backfill scripts in this package: the keyset
+batch loop and the command line entry point.
+"""
+import argparse
+import logging
+import sys
+
+from mix_db import DatabaseError, connect_with_retry
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+def backfill_table(conn, batchSize, selectQuery, writeQuery, rowArgs, label):
+    """
+    Pages through selectQuery by its first column, in batches of batchSize,
+    and runs writeQuery once for every args tuple rowArgs(row) returns.
+    selectQuery takes the last key seen and the batch size. Rows whose JSON
+    cannot be read are logged and skipped. Returns the rows read.
+    """
+    lastID = ""
+    copied = 0
+
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(selectQuery, (lastID, batchSize))
+            rows = cur.fetchall()
+
+        if not rows:
+            break
+
+        writes = []
+        for row in rows:
+            try:
+                writes.extend(rowArgs(row))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Skipping {label} {row[0]}: unreadable JSON")
+                logger.error(e)
+
+        #mix_db connections autocommit, so every batch is committed as it is written
+        if writes:
+            with conn.cursor() as cur:
+                cur.executemany(writeQuery, writes)
+
+        copied += len(rows)
+        lastID = rows[-1][0]
+        logger.info(f"Backfilled {copied} {label}s")
+
+    return copied
+
+def main(description, backfill):
+    """
+    Command line entry point of a backfill script: connects to RDS through
+    mix_db and runs backfill(conn, batchSize).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig()
+    try:
+        conn = connect_with_retry()
+    except DatabaseError as e:
+        logger.error("ERROR: Unexpected error: Could not connect to MySQL instance.")
+        logger.error(e)
+        sys.exit(1)
+
+    backfill(conn, args.batch_size)
@@ -0,0 +1,21 @@
+"""
+One-shot backfill of the group_interest index from
+group_table.group_interests, for groups written before
+migrations/002_group_interest_index.sql. Safe to re-run.
+
+Usage: rdsHost=<host> python -m migrations.backfill_group_interest [--batch-size N]
+"""
+from interest_index import parse_group_interests
+from migrations.backfill import backfill_table, main
+
+def backfill(conn, batchSize): 
+    return backfill_table(
+        conn, batchSize,
+        "SELECT group_id, group_interests FROM group_table WHERE group_id > %s ORDER BY group_id LIMIT %s",
+        "INSERT IGNORE INTO group_interest (interest, group_id) VALUES (%s, %s)",
+        lambda row: [(interest, row[0]) for interest in parse_group_interests(row[1])],
+        "group"
+    )
+
+if __name__ == "__main__": 
+    main("Backfill the group_interest index.", backfill)
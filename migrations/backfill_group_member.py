@@ -0,0 +1,31 @@
+"""
+One-shot backfill of the group_member table from user_table.groups_joined,
+for users written before migrations/007_group_member.sql. Safe to re-run.
+
+Usage: rdsHost=<host> python -m migrations.backfill_group_member [--batch-size N]
+"""
+import json
+
+from migrations.backfill import backfill_table, main
+
+def parse_groups_joined(groupsJson):
+    # user_table.groups_joined is {"groups": [group IDs]}
+    if groupsJson is None or groupsJson == "null":
+        return []
+
+    groups = json.loads(groupsJson)
+    if groups is None:
+        return []
+    return [str(groupID) for groupID in groups["groups"]]
+
+def backfill(conn, batchSize):
+    return backfill_table(
+        conn, batchSize,
+        "SELECT user_id, groups_joined FROM user_table WHERE user_id > %s ORDER BY user_id LIMIT %s",
+        "INSERT IGNORE INTO group_member (group_id, user_id) VALUES (%s, %s)",
+        lambda row: [(groupID, row[0]) for groupID in parse_groups_joined(row[1])],
+        "user"
+    )
+
+if __name__ == "__main__":
+    main("Backfill the group_member table.", backfill)
@@ -0,0 +1,25 @@
+"""
+One-shot backfill of post.like_count, post.dislike_count and post.score
+for rows written before migrations/001_post_reaction_counters.sql.
+
+Usage: rdsHost=<host> python -m migrations.backfill_post_counters [--batch-size N]
+"""
+from migrations.backfill import backfill_table, main
+from post_ranking import reaction_counts, ranking_score
+
+def post_counters(row): 
+    guid, likes, dislikes = row
+    likeCount, dislikeCount = reaction_counts(likes, dislikes)
+    return [(likeCount, dislikeCount, ranking_score(likeCount, dislikeCount), guid)]
+
+def backfill(conn, batchSize): 
+    return backfill_table(
+        conn, batchSize,
+        "SELECT guid, likes, dislikes FROM post WHERE guid > %s ORDER BY guid LIMIT %s",
+        "UPDATE post SET like_count = %s, dislike_count = %s, score = %s WHERE guid = %s",
+        post_counters,
+        "post"
+    )
+
+if __name__ == "__main__": 
+    main("Backfill post reaction counters and ranking score.", backfill)
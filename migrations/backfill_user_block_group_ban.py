@@ -0,0 +1,50 @@
+"""
+One-shot backfill of the user_block and group_ban tables from
+user_table.blocked and group_table.banned, for rows written before
+migrations/006_user_block_group_ban.sql. Safe to re-run.
+
+Usage: rdsHost=<host> python -m migrations.backfill_user_block_group_ban [--batch-size N]
+"""
+import json
+
+from migrations.backfill import backfill_table, main
+
+def parse_blocked(blockedJson):
+    # user_table.blocked is a JSON array of user IDs
+    if blockedJson is None or blockedJson == "null":
+        return []
+
+    blocked = json.loads(blockedJson)
+    if blocked is None:
+        return []
+    return [str(userID) for userID in blocked]
+
+def parse_banned(bannedJson):
+    # group_table.banned is {"banned": [{"userID": ...}, ...]}
+    if bannedJson is None or bannedJson == "null":
+        return []
+
+    banned = json.loads(bannedJson)
+    if banned is None:
+        return []
+    return [str(user["userID"]) for user in banned["banned"]]
+
+def backfill(conn, batchSize):
+    users = backfill_table(
+        conn, batchSize,
+        "SELECT user_id, blocked FROM user_table WHERE user_id > %s ORDER BY user_id LIMIT %s",
+        "INSERT IGNORE INTO user_block (blocker_id, blocked_id) VALUES (%s, %s)",
+        lambda row: [(row[0], blockedID) for blockedID in parse_blocked(row[1])],
+        "user"
+    )
+    groups = backfill_table(
+        conn, batchSize,
+        "SELECT group_id, banned FROM group_table WHERE group_id > %s ORDER BY group_id LIMIT %s",
+        "INSERT IGNORE INTO group_ban (group_id, user_id) VALUES (%s, %s)",
+        lambda row: [(row[0], userID) for userID in parse_banned(row[1])],
+        "group"
+    )
+    return users, groups
+
+if __name__ == "__main__":
+    main("Backfill the user_block and group_ban tables.", backfill)
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from instrumentation import record_query
+
+logger = logging.getLogger()
+
+#ping the shared connection before reuse once it has been idle this many seconds
+PING_AFTER_IDLE = 10
+
+#connecting is tried this many times, waiting CONNECT_BACKOFF seconds (doubling each time) between tries
+CONNECT_ATTEMPTS = 3
+CONNECT_BACKOFF = 0.2
+
+#a pool checkout waits at most this many seconds for a connection when all of them are in use
+POOL_WAIT_TIMEOUT = 5
+
+class DatabaseError(Exception):
+    """
+    Raised when RDS still cannot be reached after CONNECT_ATTEMPTS tries, or
+    when no pooled connection comes free within POOL_WAIT_TIMEOUT seconds.
+    """
+
+_pymysql = None
+
+def _driver():
+    # pymysql and rds_config are imported on first connect, not at module import, to keep cold starts short
+    global _pymysql
+    if _pymysql is None:
+        import pymysql
+        _pymysql = pymysql
+    return _pymysql
+
+def connect():
+    """
+    Opens a new autocommit connection to the RDS instance. With autocommit
+    every read sees the latest committed data without commit() round trips
+    around it, and every write is committed as it runs.
+    """
+    import rds_config
+
+    return _driver().connect(
+        host=os.environ['rdsHost'],
+        user=rds_config.db_username,
+        passwd=rds_config.db_password,
+        db=rds_config.db_name,
+        connect_timeout=5,
+        autocommit=True
+    )
+
+def connect_with_retry(attempts=CONNECT_ATTEMPTS, backoff=CONNECT_BACKOFF, sleep=time.sleep):
+    """
+    connect() with bounded retries and exponential backoff, so a brief RDS
+    blip costs a short wait instead of a failed invocation. Raises
+    DatabaseError once every attempt has failed.
+    """
+    for attempt in range(attempts):
+        try:
+            return connect()
+        except _driver().MySQLError as e:
+            if attempt == attempts - 1:
+                raise DatabaseError(f"could not connect to MySQL after {attempts} attempts") from e
+            logger.warning(f"Connecting to MySQL failed (attempt {attempt + 1} of {attempts}): {e}")
+            sleep(backoff * 2 ** attempt)
+
+def database_unavailable(e):
+    """
+    Logs a DatabaseError and returns the 503 response every handler sends
+    when it cannot reach RDS.
+    """
+    logger.error("ERROR: Unexpected error: Could not connect to MySQL instance.")
+    logger.error(e)
+    return {
+        'statusCode': 503,
+        'body': json.dumps("Service unavailable: could not connect to the database", default=str)
+    }
+
+_conn = None
+_lastUsed = 0.0
+_connLock = threading.Lock()
+
+def get_connection():
+    """
+    Returns the container's shared connection, opening it on first use and
+    reconnecting when it has gone away, so a dropped connection costs one
+    reconnect instead of the warm container. Raises DatabaseError when RDS
+    cannot be reached.
+    """
+    global _conn, _lastUsed
+    with _connLock:
+        now = time.monotonic()
+        if _conn is not None and _conn.open and now - _lastUsed > PING_AFTER_IDLE:
+            try:
+                _conn.ping(reconnect=True)
+            except _driver().MySQLError as e:
+                logger.warning(f"Shared MySQL connection lost: {e}")
+                _conn = None
+        if _conn is None or not _conn.open:
+            _conn = connect_with_retry()
+            logger.info("SUCCESS: Connection to RDS MySQL instance succeeded")
+        _lastUsed = now
+        return _conn
+
+def set_connection(conn):
+    # points the shared connection somewhere else, e.g. a local stand-in
+    global _conn, _lastUsed
+    with _connLock:
+        _conn = conn
+        _lastUsed = time.monotonic()
+
+class ConnectionPool:
+    """
+    Small pool of extra connections for running independent queries in
+    parallel. Connections are opened lazily, up to size, and kept across
+    warm invocations.
+    """
+
+    def __init__(self, size, factory=connect_with_retry):
+        self.size = size
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # opens a new connection if fewer than size are open, else returns None
+        with self._lock:
+            if self._opened >= self.size:
+                return None
+            self._opened += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _acquire(self):
+        try:
+            conn, lastUsed = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+            if conn is not None:
+                return conn
+            try:
+                conn, lastUsed = self._idle.get(timeout=POOL_WAIT_TIMEOUT)
+            except queue.Empty:
+                raise DatabaseError(f"no pooled MySQL connection came free within {POOL_WAIT_TIMEOUT} seconds") from None
+
+        #like the shared connection, a pooled one is only pinged once it has been idle PING_AFTER_IDLE seconds
+        if conn.open and time.monotonic() - lastUsed <= PING_AFTER_IDLE:
+            return conn
+        try:
+            conn.ping(reconnect=True)
+        except _driver().MySQLError as e:
+            #the dead connection gives up its slot and the checkout starts over, opening a new connection unless one has come free
+            logger.warning(f"Pooled MySQL connection lost: {e}")
+            with self._lock:
+                self._opened -= 1
+            return self._acquire()
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put((conn, time.monotonic()))
+
+#every statement is counted (with the rows it returned) in the invocation's summary line
+
+def fetch_one(conn, query, args=None):
+    with conn.cursor() as cur:
+        cur.execute(query, args)
+        row = cur.fetchone()
+    record_query(0 if row is None else 1)
+    return row
+
+def fetch_all(conn, query, args=None):
+    with conn.cursor() as cur:
+        cur.execute(query, args)
+        rows = cur.fetchall()
+    record_query(len(rows))
+    return rows
+
+def execute(conn, query, args=None):
+    with conn.cursor() as cur:
+        affected = cur.execute(query, args)
+    record_query(0)
+    return affected
+
+def execute_many(conn, query, argsList):
+    with conn.cursor() as cur:
+        affected = cur.executemany(query, argsList)
+    record_query(0)
+    return affected
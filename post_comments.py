@@ -0,0 +1,66 @@
+import logging
+import json
+import queries
+import fast_json
+from instrumentation import instrumented
+from mix_db import get_connection, fetch_one, DatabaseError, database_unavailable
+from post_record import comment_response
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+@instrumented("post_comments")
+def lambda_handler(event, context):
+    """
+    This function fetches one page of a post's comments. Pass the nextCursor
+    of the previous page as cursor to get the page after it.
+    """
+
+    try:
+        postID = event['queryStringParameters']['postID']
+        cursorStr = event['queryStringParameters'].get('cursor') or "0"
+        cursor = int(cursorStr)
+    except:
+        return {
+            'statusCode': 400,
+            'body': json.dumps("Bad request: incorrect parameters", default=str)
+        }
+
+    if cursor < 0:
+        return {
+            'statusCode': 400,
+            'body': json.dumps("Bad request: cursor must be a non-negative integer.", default=str)
+        }
+
+    try:
+        conn = get_connection()
+    except DatabaseError as e:
+        return database_unavailable(e)
+
+    commentsPerPage = 20
+
+    #only this page's slice of the comments array is read out of the row
+    commentsPath = f'$."comments"[{cursor} to {cursor + commentsPerPage - 1}]'
+    commentResult = fetch_one(conn, queries.POST_COMMENTS, (commentsPath, postID))
+
+    if commentResult is None:
+        return {
+            'statusCode': 404,
+            'body': "Error, could not find post with the given ID."
+        }
+
+    commentCount = commentResult[0] or 0
+    comments = fast_json.loads(commentResult[1]) if commentResult[1] is not None else []
+
+    nextCursor = cursor + len(comments)
+
+    finalData = {
+        "commentCount": commentCount,
+        "comments": [comment_response(comment) for comment in comments],
+        "nextCursor": str(nextCursor) if nextCursor < commentCount else None
+    }
+
+    return {
+        'statusCode': 200,
+        'body': fast_json.dumps(finalData)
+    }
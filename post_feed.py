@@ -1,157 +1,311 @@
-import sys
 import logging
-import rds_config
-import pymysql
 import json
-import boto3
 import os
 import math
-
-#rds settings
-rds_host  = os.environ['rdsHost']
-name = rds_config.db_username
-password = rds_config.db_password
-db_name = rds_config.db_name
+import itertools
+import heapq
+import hashlib
+import queries
+import fast_json
+from concurrent.futures import ThreadPoolExecutor, wait
+from mix_db import get_connection, fetch_one, fetch_all, DatabaseError, ConnectionPool, database_unavailable
+from s3_presign import create_presigned_url, presignedUrls
+from view_counter import viewCounter
+from hydration import resolve_usernames, resolve_group_names, load_posts
+from instrumentation import instrumented, stage, timed, annotate, debug_dump
+from group_cache import load_groups, group_exists, is_banned, is_private_to
+from interest_index import groups_for_interests
+from feed_store import FeedEntry, open_feed_store
+from timelines import read_timeline, pull_on_read_groups
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('logLevel', 'INFO'))
+
+#pull reads joined-group posts at request time, fanout reads the timelines written by timeline_fanout.py
+FEED_MODE = os.environ.get('feedMode', 'pull')
+
+#materialized feeds are built this many pages deep so paging forward is a slice of the stored list
+MATERIALIZED_FEED_PAGES = 5
+
+#where materialized feeds are kept: memory (per container), sqlite[:path] or mysql
+feedStore = open_feed_store(os.environ.get('feedStore', 'memory'), get_connection)
+
+#max user IDs per reverse block lookup query
+BLOCK_LOOKUP_BATCH_SIZE = 500
+
+#max recent posts pulled from the user's joined groups per request
+JOINED_GROUP_POST_LIMIT = 500
+
+#candidate windows for the global fallback stage, tried in order until the page is filled.
+#a tier with days is the newest limit posts of the past days days, and only those are ranked by score:
+#once more than limit posts are made in that many days, older high scorers in the period only come in
+#through a later tier. days=None takes the top limit posts by score overall
+GLOBAL_CANDIDATE_TIERS = (
+    {"days": 7, "limit": 1000},
+    {"days": 30, "limit": 5000},
+    {"days": None, "limit": 20000}
+)
+
+#serial runs the feed stages one after another on the handler's connection. threads runs them all at
+#once, each on its own pooled connection, and also presigns and hydrates the page in parallel
+STAGE_EXECUTION = os.environ.get('stageExecution', 'serial')
 
-try:
-    conn = pymysql.connect(host=rds_host, user=name, passwd=password, db=db_name, connect_timeout=5)
-except pymysql.MySQLError as e:
-    logger.error("ERROR: Unexpected error: Could not connect to MySQL instance.")
-    logger.error(e)
-    sys.exit()
+#worker threads and pooled connections for threads mode, one per feed stage
+STAGE_WORKERS = 3
 
-logger.info("SUCCESS: Connection to RDS MySQL instance succeeded")
+#no threads or connections are opened until threads mode first uses them; both are kept across warm invocations
+stageExecutor = ThreadPoolExecutor(max_workers=STAGE_WORKERS)
+stagePool = ConnectionPool(STAGE_WORKERS)
 
 def is_s3(url): 
     return 's3.amazonaws.com' in url or 's3://**********/' in url
 
-def group_exists(groupID): 
-    query = "SELECT COUNT(*) FROM group_table WHERE group_id = %s"
-    
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(query, groupID)
-        result = cur.fetchone()
-    conn.commit()
-    if result == 0 or result[0] == 0: 
-        return False 
+def load_json_column(value):
+    if value is None or value == "null":
+        return None
+    return json.loads(value)
 
-    return True
-    
-def user_exists(userID): 
-    query = "SELECT COUNT(*) FROM user_table WHERE user_id = %s"
-    
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(query, userID)
-        result = cur.fetchone()
-    conn.commit()
-    if result == 0 or result[0] == 0: 
-        return False 
+class ViewerContext:
+    """
+    Per-request view of the requesting user. Loads the viewer's profile row
+    once and keeps block relationships in sets. The feed stages leave blocked
+    posters out in SQL; these sets re-check the page that is actually rendered.
+    """
 
-    return True
+    def __init__(self, userID, username, groups, interests, blocked, version):
+        self.userID = userID
+        self.username = username
+        self.groups = groups
+        self.interests = interests
+        self.blocked = blocked
+        self.version = version
+        self.blockedBy = set()
+        self.resolvedPosters = set()
 
-def create_presigned_url(bucket_name, object_name, expiration=600):
-    # Generate a presigned URL for the S3 object
-    s3_client = boto3.client('s3',region_name="us-east-1",config=boto3.session.Config(signature_version='s3v4',))
-    try:
-        response = s3_client.generate_presigned_url('get_object',Params={'Bucket': bucket_name,'Key': object_name},ExpiresIn=expiration)
-    except Exception as e:
-        print(e)
-        logging.error(e)
-        return "Error"
+    @classmethod
+    def load(cls, conn, userID):
+        viewerResult = fetch_one(conn, queries.VIEWER_PROFILE, userID)
+
+        if viewerResult is None:
+            return None
+
+        groups = load_json_column(viewerResult[1])
+        interests = load_json_column(viewerResult[2])
+        blocked = load_json_column(viewerResult[3])
 
-    return response
+        #changes to joined groups, interests or blocks change the version and retire the materialized feed
+        version = hashlib.sha1("\x1f".join(str(column) for column in viewerResult[1:4]).encode()).hexdigest()
 
-def not_blocked(userID, posterID):
-    checkBlockedQuery = "SELECT blocked FROM user_table WHERE user_id = %s"
+        return cls(
+            userID,
+            viewerResult[0],
+            groups["groups"] if groups is not None else [],
+            interests["interests"] if interests is not None else [],
+            set(blocked) if blocked is not None else set(),
+            version
+        )
+
+    def resolve_blocked_by(self, conn, posterIDs):
+        # one batched lookup for posters we have not seen yet this request
+        pending = [posterID for posterID in set(posterIDs) if posterID not in self.resolvedPosters]
+
+        for start in range(0, len(pending), BLOCK_LOOKUP_BATCH_SIZE):
+            batch = pending[start:start + BLOCK_LOOKUP_BATCH_SIZE]
+            blockerResults = fetch_all(conn, queries.with_in_list(queries.BLOCKERS_OF_USER, len(batch)), (self.userID, *batch))
+            self.blockedBy.update(blocker[0] for blocker in blockerResults)
+
+            self.resolvedPosters.update(batch)
+
+    def can_see(self, posterID):
+        return posterID not in self.blocked and posterID not in self.blockedBy
+
+def recent_group_posts(conn, viewer, groupIDs): 
+    #pull-on-read: posts from the given groups within the past 3 days 
+    if not groupIDs: 
+        return
     
-    posterList = [posterID]
-    posterJsonStr = json.dumps(posterList)
+    yield from fetch_all(conn, queries.with_in_list(queries.JOINED_GROUP_POSTS, len(groupIDs)), (*groupIDs, viewer.userID, viewer.userID, JOINED_GROUP_POST_LIMIT))
 
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(checkBlockedQuery, userID)
-        blockedUserResult = cur.fetchone()
-    conn.commit()
+def timeline_group_posts(conn, viewer): 
+    #fan-out-on-write: the viewer's timeline, merged with pull-on-read for groups too large to fan out
+    joinedGroups = set(viewer.groups)
     
-    if blockedUserResult[0] is None or blockedUserResult[0] == "null": 
-        return True
-        
-    blockedUsers = json.loads(blockedUserResult[0])
+    timelinePosts = [post for post in read_timeline(conn, viewer.userID, JOINED_GROUP_POST_LIMIT) if post[3] in joinedGroups]
     
-    if blockedUsers is None:
-        return True
-    for blockedUser in blockedUsers: 
-        if blockedUser == posterID:
-            return False
-            
-    return True 
-
-def is_public_group(groupID): 
-    checkPrivate = "SELECT private FROM group_table WHERE group_id = %s"
+    pulledPosts = recent_group_posts(conn, viewer, pull_on_read_groups(conn, viewer.groups))
     
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(checkPrivate, groupID)
-        publicityResult = cur.fetchone()
-    conn.commit()
+    yield from heapq.merge(timelinePosts, pulledPosts, key=lambda post: post[1], reverse=True)
 
-    if publicityResult[0] == 0: 
-        return True
-        
-    return False 
-    
-def is_banned(userID, groupID): 
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(("SELECT banned FROM group_table WHERE group_id =%s"), groupID)
-        bannedResult = cur.fetchone()
-    conn.commit()
+def joined_group_posts(conn, viewer): 
+    #posts from joined groups within the past 3 days, newest first
+    if not viewer.groups: 
+        return
     
-    if bannedResult is None or bannedResult == "null" or bannedResult[0] is None or bannedResult[0] == "null": 
-        return False
+    if FEED_MODE == "fanout": 
+        yield from timeline_group_posts(conn, viewer)
+    else: 
+        yield from recent_group_posts(conn, viewer, viewer.groups)
+
+def recommended_posts(conn, viewer): 
+    #latest post from each public group sharing an interest with the user, newest first
+    interestGroups = groups_for_interests(conn, viewer.interests)
+    if not interestGroups: 
+        return
     
-    bannedList = json.loads(bannedResult[0])
+    yield from fetch_all(conn, queries.with_in_list(queries.LATEST_GROUP_POSTS, len(interestGroups)), (*interestGroups, viewer.userID, viewer.userID))
 
-    for user in bannedList["banned"]:
-        if user["userID"] == userID: 
-            return True
+def ranked_window(windowPosts): 
+    #heap-based top-K: heapify is O(n) and each post we actually consume costs O(log n)
+    #ties keep the window's own order, which is newest first
+    heap = [(-post[4], position) for position, post in enumerate(windowPosts)]
+    heapq.heapify(heap)
+    while heap: 
+        yield windowPosts[heapq.heappop(heap)[1]]
+
+def global_ranked_posts(conn, viewer): 
+    #public posts, best like/dislike ratio first, widening the candidate window only while the page is short.
+    #the windows only hold posts the viewer may see, so nothing is filtered here
+    seenPostIDs = set()
+    
+    for tier in GLOBAL_CANDIDATE_TIERS: 
+        if tier["days"] is None: 
+            windowPosts = fetch_all(conn, queries.TOP_SCORED_POSTS, (viewer.userID, viewer.userID, tier["limit"]))
+        else: 
+            windowPosts = fetch_all(conn, queries.RECENT_POST_WINDOW, (viewer.userID, viewer.userID, tier["days"], tier["limit"]))
         
-    return False;     
+        for post in ranked_window(windowPosts): 
+            if post[0] not in seenPostIDs: 
+                seenPostIDs.add(post[0])
+                yield post
+
+#feed stages in priority order
+FEED_STAGES = (
+    ("joinedGroups", joined_group_posts),
+    ("recommendations", recommended_posts),
+    ("globalRanking", global_ranked_posts)
+)
 
-def calculate_ratio(post):
-    # print(f"Post for ratio: {post}")
+def pooled(function, *args): 
+    # runs function(conn, *args) on a connection from the stage pool
+    with stagePool.connection() as conn: 
+        return function(conn, *args)
+
+def prefetch_stage(conn, viewer, name, posts, limit): 
+    #a stage never adds more than limit posts to the feed unless earlier stages already had some of them
+    return list(itertools.islice(timed(name, posts(conn, viewer)), limit))
+
+def concurrent_stages(conn, viewer, limit): 
+    """
+    Starts every feed stage at once on the stage pool and yields their posts
+    stage by stage in priority order, so the feed comes out the same as in
+    serial mode. A stage that was cut off at limit posts and is still needed
+    is read again in full on the handler's connection.
+    """
+    futures = [stageExecutor.submit(pooled, prefetch_stage, viewer, name, posts, limit) for name, posts in FEED_STAGES]
     try: 
-        likes = json.loads(post[8])
-    except: 
-        likes = "null"
+        for (name, posts), future in zip(FEED_STAGES, futures): 
+            prefix = future.result()
+            yield prefix
+            if len(prefix) >= limit: 
+                yield timed(name, posts(conn, viewer))
+    finally: 
+        #stages the feed did not need still finish inside this invocation
+        wait(futures)
+
+def build_feed(conn, viewer, limit): 
+    """
+    Pulls posts from each stage in priority order, skipping any already in
+    the feed, and stops as soon as limit posts have been accepted.
+    """
+    feedPosts = []
+    feedPostIDs = set()
     
-    try: 
-        dislikes = json.loads(post[9])
-    except: 
-        dislikes = "null"
-        
-    # print(f"Likes: {likes} \n Dislikes: {dislikes}")
-    likeCount = 0
-    dislikeCount = 0
+    if STAGE_EXECUTION == "threads": 
+        stages = concurrent_stages(conn, viewer, limit)
+    else: 
+        stages = (timed(name, posts(conn, viewer)) for name, posts in FEED_STAGES)
+    for post in itertools.chain.from_iterable(stages): 
+        if post[0] in feedPostIDs: 
+            continue
+        feedPostIDs.add(post[0])
+        feedPosts.append(post)
+        if len(feedPosts) >= limit: 
+            break
     
-    if likes is not None and likes != "null": 
-        likeCount = len(likes["likes"])
+    return feedPosts
 
-    if dislikes is not None and dislikes != "null": 
-        dislikeCount = len(dislikes["dislikes"])
-        
-        
-    # print(f"LikeCount: {likeCount} \n DislikeCount: {dislikeCount}")
-    if dislikeCount == 0: 
-        return likeCount
-    else: 
-        return (likeCount / dislikeCount)
+def materialized_feed(conn, viewer, count, minCount): 
+    """
+    Returns the first count post GUIDs of the viewer's feed. A fresh stored
+    feed that covers them is sliced directly; otherwise the feed is rebuilt
+    to at least minCount posts and stored.
+    """
+    with stage("feedStore"): 
+        entry = feedStore.get(viewer.userID)
+    if entry is not None and entry.is_fresh(viewer.version) and entry.covers(count): 
+        annotate(feedStoreHit=True)
+        return entry.postIDs[:count]
+    
+    annotate(feedStoreHit=False)    
+    target = max(count, minCount)
+    feedPosts = build_feed(conn, viewer, target)
+    entry = FeedEntry(viewer.version, [post[0] for post in feedPosts], len(feedPosts) < target)
+    with stage("feedStore"): 
+        feedStore.put(viewer.userID, entry)
+    
+    return entry.postIDs[:count]
+
+def load_page_posts(conn, viewer, postIDs, reactionCounts=False): 
+    """
+    Loads the full PostRecords, blobs included, for a page of post GUIDs in
+    feed order. Posts that were deleted, whose poster has since been blocked or
+    banned, or whose group has gone private without the viewer in it, are left
+    out and the stored feed is dropped so the next request rebuilds it.
+    """
+    if not postIDs: 
+        return []
+    
+    postResults = load_posts(conn, postIDs, reactionCounts, viewer.userID)
+    
+    viewer.resolve_blocked_by(conn, (post.posterID for post in postResults))
+    load_groups(conn, [post.groupID for post in postResults])
+    
+    joinedGroups = set(viewer.groups)
+    pagePosts = []
+    for post in postResults: 
+        if not viewer.can_see(post.posterID) or not group_exists(conn, post.groupID) or is_banned(conn, post.posterID, post.groupID): 
+            continue
+        #recommendation and global posts were public when the feed was stored
+        if is_private_to(conn, post.groupID, joinedGroups): 
+            continue
+        pagePosts.append(post)
+    
+    if len(pagePosts) < len(postIDs): 
+        feedStore.invalidate(viewer.userID)
+    
+    return pagePosts
+
+def resolve_page_names(conn, pagePosts): 
+    #poster and group names for the page; threads mode looks up usernames on a pooled connection meanwhile
+    posterIDs = [post.posterID for post in pagePosts]
+    groupIDs = [post.groupID for post in pagePosts]
+    
+    if STAGE_EXECUTION != "threads": 
+        return resolve_usernames(conn, posterIDs), resolve_group_names(conn, groupIDs)
+    
+    posterNames = stageExecutor.submit(pooled, resolve_usernames, posterIDs)
+    groupNames = resolve_group_names(conn, groupIDs)
+    return posterNames.result(), groupNames
 
+def presign_page(pagePosts): 
+    #threads mode signs every S3 object on the page in parallel up front; serial mode signs them while rendering
+    if STAGE_EXECUTION != "threads": 
+        return {}
+    
+    objects = list({post.s3URL.replace("s3://********/","") for post in pagePosts if post.s3URL != None and str(post.s3URL) != "null" and is_s3(post.s3URL)})
+    return dict(zip(objects, stageExecutor.map(lambda obj: create_presigned_url('********',obj,3600), objects)))
+
+@instrumented("post_feed")
 def lambda_handler(event, context):
     """
     This function fetches content from MySQL RDS instance
@@ -161,313 +315,127 @@ def lambda_handler(event, context):
         userID = event['queryStringParameters']['userID']
         pageStr = event['queryStringParameters']['page']
         page = int(pageStr) - 1
+        reactions = event['queryStringParameters'].get('reactions', "lists")
     except:
         return {
             'statusCode': 400,
             'body': json.dumps("Bad request: incorrect parameters", default=str)
         }
     
+    if reactions not in ("lists", "counts"): 
+        return {
+            'statusCode': 400, 
+            'body': json.dumps("Bad request: reactions must be either 'lists' or 'counts.'", default=str)
+        }
+    
     if page < 0:
         return {
             'statusCode': 400, 
             'body': json.dumps("Bad request: page must be a positive integer.", default=str)
         }
     
-    with conn.cursor() as cur:
-        conn.commit()
-        cur.execute("SELECT username FROM user_table WHERE user_id = %s", userID)
-        checkUserResult = cur.fetchone()
-    conn.commit()
-
+    try:
+        conn = get_connection()
+    except DatabaseError as e:
+        return database_unavailable(e)
     
-    if checkUserResult is None: 
+    with stage("viewer"): 
+        viewer = ViewerContext.load(conn, userID)
+
+    if viewer is None: 
         return {
             'statusCode': 404, 
             'body': "Error, could not find user with the given ID."
         }
     
-    #get joined groups 
-    with conn.cursor() as cur:
-        conn.commit()
-        cur.execute("SELECT groups_joined FROM user_table WHERE user_id = %s", userID)
-        groupResults = cur.fetchone()
-    conn.commit()
-    
-    groups = json.loads(groupResults[0])
-    
-    feedPosts = []
-    
-    #get posts from joined groups within the past 3 days 
-    if groups is not None and groups != "null": 
-        for group in groups["groups"]: 
-            with conn.cursor() as cur:
-                conn.commit()
-                cur.execute("SELECT * FROM post WHERE group_id = %s AND creation_date >= DATE_SUB(NOW(), INTERVAL 3 DAY) ORDER BY creation_date DESC", group)
-                groupPostsResults = cur.fetchall()
-            conn.commit()
-        
-            for post in groupPostsResults: 
-                posterID = post[3]
-                groupID = post[4]
-                if not group_exists(groupID) or not user_exists(posterID): 
-                    continue
-                if is_banned(posterID, groupID): 
-                    continue
-                if not_blocked(userID, posterID) and not_blocked(posterID, userID): 
-                    feedPosts.append(post)
-        
-    print("POSTS FROM JOINED GROUPS: ")
-    print(feedPosts)
-    
-    feedPosts = sorted(feedPosts, key=lambda x: x[2], reverse=True)
-    
-    with conn.cursor() as cur:
-        conn.commit()
-        cur.execute("SELECT interests FROM user_table WHERE user_ID = %s", userID)
-        interestsResult = cur.fetchone()
-    conn.commit()
-    
-    interests = json.loads(interestsResult[0])
-    recommendedPosts = []
-    if interests is not None and interests != "null": 
-        for interest in interests["interests"]:
-            getInterestGroupQuery = """
-            SELECT group_id
-            FROM group_table
-            WHERE JSON_CONTAINS(group_interests->'$."group_interests"', %s)
-            """
-            
-            interestList = [interest]
-            interestJsonStr = json.dumps(interestList)
-            
-            #gets groups that have common interest with user's list 
-            with conn.cursor() as cur: 
-                conn.commit()
-                cur.execute(getInterestGroupQuery, (interestJsonStr,))
-                interestGroupResult = cur.fetchall()
-            conn.commit()
-            
-            if interestGroupResult is not None: 
-                for interestGroup in interestGroupResult: 
-                    with conn.cursor() as cur: 
-                        conn.commit()
-                        cur.execute("SELECT * FROM post WHERE group_id = %s ORDER BY creation_date DESC LIMIT 1", interestGroup[0])
-                        recentGroupPost = cur.fetchone()
-                    conn.commit()
-
-                    if recentGroupPost is not None and recentGroupPost != "null":
-                        if not group_exists(recentGroupPost[4]) or not user_exists(recentGroupPost[3]): 
-                            continue
-                        if (not_blocked(userID, recentGroupPost[3]) and not_blocked(recentGroupPost[3], userID)) and recentGroupPost not in feedPosts and recentGroupPost not in recommendedPosts and is_public_group(recentGroupPost[4]):
-                            if is_banned(recentGroupPost[3], recentGroupPost[4]): 
-                                continue
-                            recommendedPosts.append(recentGroupPost)
-
-    print("RECOMMENDED POSTS: ")
-    print(recommendedPosts)
-    
-    if len(recommendedPosts) > 0: 
-        recommendedPosts = sorted(recommendedPosts, key=lambda x: x[2], reverse=True)
-        feedPosts.extend(recommendedPosts)
-        
-    print("FEED SO FAR: ")
-    print(feedPosts)
-    queryString = "SELECT * FROM post ORDER BY creation_date DESC"
-    
-    with conn.cursor() as cur:
-        conn.commit()
-        cur.execute(queryString)
-        result = cur.fetchall()
-    conn.commit()
-    
-    
-    sortedPosts = sorted(result, key=lambda post: calculate_ratio(post), reverse=True)
-    # print(f"Pre-sort: {result}\nPost-sort:{sortedPosts}")
-    for post in sortedPosts: 
-        if not group_exists(post[4]) or not user_exists(post[3]): 
-            continue
-        if (not_blocked(userID, post[3]) and not_blocked(post[3], userID)) and post not in feedPosts and is_public_group(post[4]):
-            if is_banned(post[3], post[4]):
-                continue
-            feedPosts.append(post)
-    
-    numPosts = len(feedPosts)
-    print("Number of posts: ")
-    print(numPosts)
-    
     postsPerPage = 10
     pagePosts = page * postsPerPage
     
-    numPages = math.ceil(numPosts / postsPerPage)
+    #one extra post tells us whether another page exists without building the whole feed.
+    #in threads mode the stages run on pooled connections, which can fail to connect too
+    try: 
+        feedPostIDs = materialized_feed(conn, viewer, pagePosts + postsPerPage + 1, MATERIALIZED_FEED_PAGES * postsPerPage + 1)
+    except DatabaseError as e: 
+        return database_unavailable(e)
+    hasMore = len(feedPostIDs) > pagePosts + postsPerPage
+    
+    numPosts = len(feedPostIDs)
+    debug_dump("Number of posts", numPosts)
+    
+    if hasMore: 
+        numPages = page + 2
+    else: 
+        numPages = math.ceil(numPosts / postsPerPage)
     
     if page > numPages: 
-        print("No results on this page.")
+        logger.info("No results on this page.")
         return {
             'statusCode': 400,
             'body': "There are no posts on this page. Please try a lower page number"
         }
     
+    pagePostIDs = feedPostIDs[pagePosts:pagePosts + postsPerPage]
+    with stage("pageLoad"): 
+        pageSlice = load_page_posts(conn, viewer, pagePostIDs, reactions == "counts")
+    
+    #resolve every poster and group name on the page up front
+    try: 
+        with stage("hydration"): 
+            posterNames, groupNames = resolve_page_names(conn, pageSlice)
+    except DatabaseError as e: 
+        return database_unavailable(e)
+    
+    with stage("presign"): 
+        presignedURLs = presign_page(pageSlice)
+    
     data = []
-    for i in range(pagePosts, (pagePosts + postsPerPage)):
-        try:
-            testVar = feedPosts[i]
-        except IndexError:
-            print("Out of bounds, no more posts!")
-            break
-        
-        postID = feedPosts[i][0]
-        
-        #update views for each post rendered 
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("UPDATE post SET views = views + 1 WHERE guid =%s",postID)
-        conn.commit()
-        
-        s3URL = feedPosts[i][1]
-        
-        createDate = json.dumps(feedPosts[i][2], default=str)
-        createDate = createDate.replace("\\","")
-        createDate = createDate.replace("\"","")
-        
-        posterID = feedPosts[i][3]
-        
-        groupID = feedPosts[i][4]
-        
-        if is_banned(posterID, groupID): 
-            continue
-        
-        caption = feedPosts[i][5]
-        
-        edited = json.dumps(feedPosts[i][6], default=str)
-        
-        tmp = json.dumps(feedPosts[i][7], default=str)
-        if tmp != "null": 
-            comments = json.loads(feedPosts[i][7])
-        else: 
-            comments = "null"
-        
-        commentList = []
-        
-        if comments != "null" and comments is not None and comments != 0: 
-            for comment in comments["comments"]:
-                text = comment["text"]
-                commenter = comment["username"]
-                
-                commentData = {
-                    "text": text,
-                    "username": commenter
-                }
-                commentList.append(commentData)
-                
-        if len(commentList) == 0:
-            commentList = "null"
-            
-        likes = json.dumps(feedPosts[i][8], default=str)
-        if likes != "null":
-            likes = json.loads(feedPosts[i][8])
-        else:
-            likes = "null"
-
-        dislikes = json.dumps(feedPosts[i][9], default=str)
-        if dislikes != "null": 
-            dislikes = json.loads(feedPosts[i][9])
-        else: 
-            dislikes = "null"
-            
-        dislikeList = []
-        if dislikes == "null" or dislikes is None: 
-            dislikeList = "null"
-        else: 
-            for dislike in dislikes["dislikes"]:
-                dislikeList.append(dislike)
-        
-        views = feedPosts[i][10]
-        
-        tmp = s3URL
-        purl = ""
-        if tmp == None or str(tmp) == "null": 
-            purl = "null"
-        else: 
-            if is_s3(tmp): 
-                obj = tmp.replace("s3://********/","")
-                purl = create_presigned_url('********',obj,3600)
-                if purl == "Error": 
-                    return {
-                        'statusCode': 403, 
-                        'body': "unable to make S3 pre-signed URL"
-                    }
+    with stage("render"): 
+        for post in pageSlice:
+            purl = ""
+            if post.s3URL == None or str(post.s3URL) == "null": 
+                purl = "null"
             else: 
-                purl = tmp
-                
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("SELECT username FROM user_table WHERE user_id =%s", posterID)
-            posterName = cur.fetchone()
-        conn.commit()
-        
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("SELECT group_name FROM group_table WHERE group_id =%s", groupID)
-            groupName = cur.fetchone()
-        conn.commit()        
-        
-        dataList = ""
-        if likes == "null" or likes is None:
-            likes = "null"
-            dataList = {
-                "ID": postID,
-                "s3_url": purl,
-                "timestamp": createDate, 
-                "posterID": posterID,
-                "username": posterName[0],
-                "groupID": groupID, 
-                "groupName": groupName[0],
-                "caption": caption,
-                "edited": edited, 
-                "comments": commentList,
-                "dislikes": dislikeList,
-                "views": views,
-                "likes": likes
-            }
-        else:
-            dataList = {
-                "ID": postID,
-                "s3_url": purl,
-                "timestamp": createDate, 
-                "posterID": posterID,
-                "username": posterName[0],
-                "groupID": groupID, 
-                "groupName": groupName[0],
-                "caption": caption,
-                "edited": edited, 
-                "comments": commentList,
-                "dislikes": dislikeList,
-                "views": views
-            }
-            dataList.update(likes)
-        data.append(dataList)
-    
-    print("Data: ")
-    print(data)
+                if is_s3(post.s3URL): 
+                    obj = post.s3URL.replace("s3://********/","")
+                    with stage("presign"): 
+                        purl = presignedURLs[obj] if obj in presignedURLs else create_presigned_url('********',obj,3600)
+                    if purl == "Error": 
+                        return {
+                            'statusCode': 403, 
+                            'body': "unable to make S3 pre-signed URL"
+                        }
+                else: 
+                    purl = post.s3URL
+            
+            data.append(post.to_response(purl, posterNames.get(post.posterID), groupNames.get(post.groupID)))
+    
+    #update views for each post rendered in one statement (or buffer them in write-behind mode)
+    with stage("viewUpdates"): 
+        viewCounter.record(conn, [post["ID"] for post in data])
+    
+    debug_dump("Data", data)
     if not data: 
-        print("No results on this page.")
+        logger.info("No results on this page.")
         return {
             'statusCode': 400,
             'body': "There are no posts on this page. Please try a lower page number"
         }
         
-    if feedPosts == None:
+    if feedPostIDs == None:
          return {
             'statusCode': 500,
             'body': json.dumps("Failed to get posts. No posts found for given user or group. src: rds-batch-posts-made", default=str)
         }
     
+    annotate(posts=len(data), presignCache=presignedUrls.stats())
+    
     finalData = {
         "numPages": numPages,
+        "hasMore": hasMore,
         "posts": data
     }
     
     return {
         'statusCode': 200,
-        'body': json.dumps(finalData,default=str)
+        'body': fast_json.dumps(finalData)
     }
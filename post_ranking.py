@@ -0,0 +1,34 @@
+import json
+
+def reaction_counts(likesJson, dislikesJson):
+    """
+    Counts the entries of a post's likes/dislikes JSON columns. Missing,
+    null or unparseable columns count as zero.
+    """
+    try: 
+        likes = json.loads(likesJson)
+    except: 
+        likes = "null"
+    
+    try: 
+        dislikes = json.loads(dislikesJson)
+    except: 
+        dislikes = "null"
+    
+    likeCount = 0
+    dislikeCount = 0
+    
+    if likes is not None and likes != "null": 
+        likeCount = len(likes["likes"])
+
+    if dislikes is not None and dislikes != "null": 
+        dislikeCount = len(dislikes["dislikes"])
+    
+    return likeCount, dislikeCount
+
+def ranking_score(likeCount, dislikeCount):
+    # same value the post table triggers store in post.score
+    if dislikeCount == 0: 
+        return likeCount
+    else: 
+        return (likeCount / dislikeCount)
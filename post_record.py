@@ -0,0 +1,103 @@
+import json
+
+import fast_json
+
+def _load_json_column(value):
+    if value is None or value == "null":
+        return None
+    return fast_json.loads(value)
+
+def comment_response(comment):
+    return {"text": comment["text"], "username": comment["username"]}
+
+class PostRecord:
+    """
+    One post row with its JSON columns parsed once. Built from the
+    queries.POSTS_BY_GUID rows loaded for the page being rendered, so
+    comments only holds the first COMMENT_PREVIEW_SIZE of commentCount.
+    With reactionCounts the row comes from
+    queries.POSTS_BY_GUID_WITH_REACTION_COUNTS and carries counts and the
+    viewer's reaction instead of the liker lists.
+    """
+
+    __slots__ = ("postID", "s3URL", "createdAt", "posterID", "groupID", "caption", "edited", "comments", "commentCount",
+                 "likes", "dislikes", "views", "reactionCounts", "likeCount", "dislikeCount", "reaction")
+
+    def __init__(self, row, reactionCounts=False):
+        self.postID = row[0]
+        self.s3URL = row[1]
+        self.createdAt = row[2]
+        self.posterID = row[3]
+        self.groupID = row[4]
+        self.caption = row[5]
+        self.edited = row[6]
+
+        comments = _load_json_column(row[7])
+        self.comments = [comment_response(comment) for comment in comments] if comments else None
+        self.commentCount = row[11] or 0
+
+        self.views = row[10]
+        self.reactionCounts = reactionCounts
+
+        if reactionCounts:
+            self.likes = self.dislikes = None
+            self.likeCount = row[8]
+            self.dislikeCount = row[9]
+            if row[12]:
+                self.reaction = "like"
+            elif row[13]:
+                self.reaction = "dislike"
+            else:
+                self.reaction = None
+        else:
+            self.likes = _load_json_column(row[8])
+            dislikes = _load_json_column(row[9])
+            self.dislikes = list(dislikes["dislikes"]) if dislikes is not None else None
+            self.likeCount = self.dislikeCount = self.reaction = None
+
+    def to_response(self, purl, username, groupName):
+        """
+        The post as the handlers return it. Missing comments, likes and
+        dislikes are sent as the string "null". With reactionCounts the
+        likes and dislikes lists are replaced by like_count, dislike_count
+        and reaction ("like", "dislike" or null for the viewer).
+        """
+        if self.reactionCounts:
+            return {
+                "ID": self.postID,
+                "s3_url": purl,
+                "timestamp": "null" if self.createdAt is None else str(self.createdAt),
+                "posterID": self.posterID,
+                "username": username,
+                "groupID": self.groupID,
+                "groupName": groupName,
+                "caption": self.caption,
+                "edited": json.dumps(self.edited, default=str),
+                "comments": self.comments if self.comments is not None else "null",
+                "commentCount": self.commentCount,
+                "like_count": self.likeCount,
+                "dislike_count": self.dislikeCount,
+                "reaction": self.reaction,
+                "views": self.views
+            }
+
+        post = {
+            "ID": self.postID,
+            "s3_url": purl,
+            "timestamp": "null" if self.createdAt is None else str(self.createdAt),
+            "posterID": self.posterID,
+            "username": username,
+            "groupID": self.groupID,
+            "groupName": groupName,
+            "caption": self.caption,
+            "edited": json.dumps(self.edited, default=str),
+            "comments": self.comments if self.comments is not None else "null",
+            "commentCount": self.commentCount,
+            "dislikes": self.dislikes if self.dislikes is not None else "null",
+            "views": self.views
+        }
+        if self.likes is None:
+            post["likes"] = "null"
+        else:
+            post.update(self.likes)
+        return post
@@ -1,62 +1,50 @@
-import sys
 import logging
-import rds_config
-import pymysql
 import json
-import boto3
 import os
 import math
-
-#rds settings
-rds_host  = os.environ['rdsHost']
-name = rds_config.db_username
-password = rds_config.db_password
-db_name = rds_config.db_name
+import base64
+import queries
+import fast_json
+from mix_db import get_connection, fetch_one, fetch_all, DatabaseError, database_unavailable
+from s3_presign import create_presigned_url, presignedUrls
+from view_counter import viewCounter
+from hydration import resolve_usernames, resolve_group_names, load_posts
+from ttl_cache import TTLCache
+from instrumentation import instrumented, stage, annotate, debug_dump
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('logLevel', 'INFO'))
 
-try:
-    conn = pymysql.connect(host=rds_host, user=name, passwd=password, db=db_name, connect_timeout=5)
-except pymysql.MySQLError as e:
-    logger.error("ERROR: Unexpected error: Could not connect to MySQL instance.")
-    logger.error(e)
-    sys.exit()
+#post counts per user/group for numPages; new posts show up in the page count within POST_COUNT_CACHE_TTL seconds
+POST_COUNT_CACHE_SIZE = 5000
+POST_COUNT_CACHE_TTL = 60
 
-logger.info("SUCCESS: Connection to RDS MySQL instance succeeded")
+postCountCache = TTLCache(POST_COUNT_CACHE_SIZE, POST_COUNT_CACHE_TTL)
 
-def is_s3(url): 
-    return 's3.amazonaws.com' in url or 's3://mixbucket/' in url
+def count_posts(conn, nameType, id, countQuery): 
+    #bans and unbans, like new posts, show up in the count within POST_COUNT_CACHE_TTL seconds
+    key = (nameType, id)
+    numPosts = postCountCache.get(key)
+    if numPosts is None: 
+        numPosts = fetch_one(conn, countQuery, id)[0]
+        postCountCache.put(key, numPosts)
+    return numPosts
 
-def create_presigned_url(bucket_name, object_name, expiration=600):
-    # Generate a presigned URL for the S3 object
-    s3_client = boto3.client('s3',region_name="us-east-1",config=boto3.session.Config(signature_version='s3v4',))
-    try:
-        response = s3_client.generate_presigned_url('get_object',Params={'Bucket': bucket_name,'Key': object_name},ExpiresIn=expiration)
-    except Exception as e:
-        print(e)
-        logging.error(e)
-        return "Error"
+def encode_cursor(creationDate, guid): 
+    return base64.urlsafe_b64encode(json.dumps([str(creationDate), guid]).encode()).decode()
 
-    return response
+def decode_cursor(cursor): 
+    # raises ValueError for anything encode_cursor did not produce
+    try: 
+        creationDate, guid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e: 
+        raise ValueError("invalid cursor") from e
+    return creationDate, guid
 
-def is_banned(userID, groupID): 
-    with conn.cursor() as cur: 
-        conn.commit()
-        cur.execute(("SELECT banned FROM group_table WHERE group_id =%s"), groupID)
-        bannedResult = cur.fetchone()
-    conn.commit()
-    
-    if bannedResult is None or bannedResult == "null" or bannedResult[0] is None or bannedResult[0] == "null": 
-        return False
-    
-    bannedList = json.loads(bannedResult[0])
-    for user in bannedList["banned"]:
-        if user["userID"] == userID: 
-            return True
-        
-    return False;     
+def is_s3(url): 
+    return 's3.amazonaws.com' in url or 's3://mixbucket/' in url
 
+@instrumented("posts_made")
 def lambda_handler(event, context):
     """
     This function fetches content from MySQL RDS instance
@@ -67,18 +55,31 @@ def lambda_handler(event, context):
         id = event['queryStringParameters']['id']
         pageStr = event['queryStringParameters']['page']
         page = int(pageStr) - 1
+        reactions = event['queryStringParameters'].get('reactions', "lists")
+        viewerID = event['queryStringParameters'].get('viewerID')
+        cursor = event['queryStringParameters'].get('cursor')
+        if cursor is not None: 
+            cursorDate, cursorGuid = decode_cursor(cursor)
     except:
         return {
             'statusCode': 400,
             'body': json.dumps("Bad request: incorrect parameters", default=str)
         }
     
-    queryString = ""
-    banned = ""
+    if reactions not in ("lists", "counts"): 
+        return {
+            'statusCode': 400, 
+            'body': json.dumps("Bad request: reactions must be either 'lists' or 'counts.'", default=str)
+        }
+    
     if nameType == "user": 
-        queryString = "SELECT * FROM post WHERE poster_id =%s ORDER BY creation_date DESC"
+        countQuery = queries.POST_COUNT_BY_USER
+        pageQuery = queries.POST_PAGE_BY_USER
+        afterQuery = queries.POST_PAGE_BY_USER_AFTER
     elif nameType == "group":
-        queryString = "SELECT * FROM post WHERE group_id =%s ORDER BY creation_date DESC"
+        countQuery = queries.POST_COUNT_BY_GROUP
+        pageQuery = queries.POST_PAGE_BY_GROUP
+        afterQuery = queries.POST_PAGE_BY_GROUP_AFTER
     else: 
         return {
             'statusCode': 400, 
@@ -97,165 +98,71 @@ def lambda_handler(event, context):
             'body': json.dumps("Bad request: user/group name could not be found", default=str)
         }
     
-    with conn.cursor() as cur:
-        conn.commit()
-        cur.execute(queryString, id)
-        result = cur.fetchall()
-    conn.commit()
+    try:
+        conn = get_connection()
+    except DatabaseError as e:
+        return database_unavailable(e)
     
-    numPosts = len(result)
-    print("Number of posts: ")
-    print(numPosts)
+    #a group's banned posters are left out in SQL (an anti-join on group_ban) so pages stay full and numPages only counts what is shown
+    with stage("count"): 
+        numPosts = count_posts(conn, nameType, id, countQuery)
+    debug_dump("Number of posts", numPosts)
     
     postsPerPage = 10
     pagePosts = page * postsPerPage
     
     numPages = math.ceil(numPosts / postsPerPage)
     
-    data = []
-    for i in range(pagePosts, (pagePosts + postsPerPage)):
-        try:
-            testVar = result[i]
-        except IndexError:
-            print("Out of bounds, no more posts!")
-            break
-        
-        postID = result[i][0]
-        
-        #update views for each post rendered 
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("UPDATE post SET views = views + 1 WHERE guid =%s",postID)
-        conn.commit()
-        
-        s3URL = result[i][1]
-        
-        createDate = json.dumps(result[i][2], default=str)
-        createDate = createDate.replace("\\","")
-        createDate = createDate.replace("\"","")
-        
-        posterID = result[i][3]
-        
-        if nameType == "group": 
-            if is_banned(posterID, id):
-                continue
-        
-        groupID = result[i][4]
-        
-        caption = result[i][5]
-        
-        edited = json.dumps(result[i][6], default=str)
-        
-        tmp = json.dumps(result[i][7], default=str)
-        if tmp != "null": 
-            comments = json.loads(result[i][7])
-        else: 
-            comments = "null"
-            
-        commentList = []
-        if comments != "null" and comments is not None: 
-            for comment in comments["comments"]:
-                text = comment["text"]
-                commenter = comment["username"]
-                
-                commentData = {
-                    "text": text,
-                    "username": commenter
-                }
-                commentList.append(commentData)    
-        
-        if len(commentList) == 0:
-            commentList = "null"
-        
-        likes = json.dumps(result[i][8], default=str)
-        if likes != "null":
-            likes = json.loads(result[i][8])
-        else:
-            likes = "null"
-        
-        dislikes = json.dumps(result[i][9], default=str)
-        if dislikes != "null":
-            dislikes = json.loads(result[i][9])
-        else:
-            dislikes = "null"
-
-        dislikeList = []
-        if dislikes == "null" or dislikes is None: 
-            dislikeList = "null"
-        else: 
-            for dislike in dislikes["dislikes"]:
-                dislikeList.append(dislike)
-        
-        views = result[i][10]
-        
-        tmp = s3URL
-        purl = ""
-        if tmp == None or str(tmp) == "null": 
-            purl = "null"
+    #only the page's GUIDs are read, one extra to know whether a next page exists.
+    #a cursor from the previous page skips straight to the next one however deep it is
+    with stage("pageQuery"): 
+        if cursor is not None: 
+            result = fetch_all(conn, afterQuery, (id, cursorDate, cursorDate, cursorGuid, postsPerPage + 1))
         else: 
-            if is_s3(tmp): 
-                obj = tmp.replace("s3://mixbucket/","")
-                purl = create_presigned_url('mixbucket',obj,3600)
-                if purl == "Error": 
-                    return {
-                        'statusCode': 403, 
-                        'body': "unable to make S3 pre-signed URL"
-                    }
+            result = fetch_all(conn, pageQuery, (id, postsPerPage + 1, pagePosts))
+    
+    pageIDs = result[:postsPerPage]
+    if len(result) > postsPerPage: 
+        nextCursor = encode_cursor(pageIDs[-1][1], pageIDs[-1][0])
+    else: 
+        nextCursor = None
+    
+    with stage("pageLoad"): 
+        pageSlice = load_posts(conn, [post[0] for post in pageIDs], reactions == "counts", viewerID)
+    
+    #resolve every poster and group name on the page up front
+    with stage("hydration"): 
+        posterNames = resolve_usernames(conn, [post.posterID for post in pageSlice])
+        groupNames = resolve_group_names(conn, [post.groupID for post in pageSlice])
+    
+    data = []
+    with stage("render"): 
+        for post in pageSlice:
+            purl = ""
+            if post.s3URL == None or str(post.s3URL) == "null": 
+                purl = "null"
             else: 
-                purl = tmp
-                
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("SELECT username FROM user_table WHERE user_id =%s", posterID)
-            posterName = cur.fetchone()
-        conn.commit()
-        
-        with conn.cursor() as cur:
-            conn.commit()
-            cur.execute("SELECT group_name FROM group_table WHERE group_id =%s", groupID)
-            groupName = cur.fetchone()
-        conn.commit()
-        
-        dataList = ""
-        if likes == "null" or likes is None:
-            likes = "null"
-            dataList = {
-                "ID": postID,
-                "s3_url": purl,
-                "timestamp": createDate, 
-                "posterID": posterID,
-                "username": posterName[0],
-                "groupID": groupID, 
-                "groupName": groupName[0],
-                "caption": caption,
-                "edited": edited, 
-                "comments": commentList,
-                "dislikes": dislikeList,
-                "views": views,
-                "likes": likes
-            }
-        else:
-            dataList = {
-                "ID": postID,
-                "s3_url": purl,
-                "timestamp": createDate, 
-                "posterID": posterID,
-                "username": posterName[0],
-                "groupID": groupID, 
-                "groupName": groupName[0],
-                "caption": caption,
-                "edited": edited, 
-                "comments": commentList,
-                "dislikes": dislikeList,
-                "views": views
-            }
-            dataList.update(likes)
-        data.append(dataList)
+                if is_s3(post.s3URL): 
+                    obj = post.s3URL.replace("s3://mixbucket/","")
+                    with stage("presign"): 
+                        purl = create_presigned_url('mixbucket',obj,3600)
+                    if purl == "Error": 
+                        return {
+                            'statusCode': 403, 
+                            'body': "unable to make S3 pre-signed URL"
+                        }
+                else: 
+                    purl = post.s3URL
+            
+            data.append(post.to_response(purl, posterNames.get(post.posterID), groupNames.get(post.groupID)))
     
-    print("Data: ")
-    print(data)
+    #update views for each post rendered in one statement (or buffer them in write-behind mode)
+    with stage("viewUpdates"): 
+        viewCounter.record(conn, [post["ID"] for post in data])
+    
+    debug_dump("Data", data)
     if not data: 
-        print("No results on this page.")
+        logger.info("No results on this page.")
         return {
             'statusCode': 400,
             'body': "There are no posts on this page. Please try a lower page number"
@@ -267,12 +174,15 @@ def lambda_handler(event, context):
             'body': json.dumps("Failed to get posts. No posts found for given user or group. src: rds-batch-posts-made", default=str)
         }
     
+    annotate(posts=len(data), presignCache=presignedUrls.stats())
+    
     finalData = {
         "numPages": numPages,
+        "nextCursor": nextCursor,
         "posts": data
     }
     
     return {
         'statusCode': 200,
-        'body': json.dumps(finalData,default=str)
+        'body': fast_json.dumps(finalData)
     }
@@ -0,0 +1,225 @@
+"""
+Every SQL statement the handlers and shared modules run. Statements with
+an IN (...) list carry a {placeholders} field; fill it with with_in_list().
+"""
+
+def in_placeholders(count):
+    return ", ".join(["%s"] * count)
+
+def with_in_list(query, count):
+    return query.format(placeholders=in_placeholders(count))
+
+#narrow columns candidate queries select so the comments/likes/dislikes blobs are only read for the rendered page.
+#candidate rows are (guid, creation_date, poster_id, group_id, score)
+CANDIDATE_COLUMNS = "p.guid, p.creation_date, p.poster_id, p.group_id, p.score"
+
+#ban check shared by every candidate query on post as p, an anti-join on the group_ban primary key
+#(migrations/006_user_block_group_ban.sql)
+NOT_BANNED = "NOT EXISTS (SELECT 1 FROM group_ban gb WHERE gb.group_id = p.group_id AND gb.user_id = p.poster_id)"
+
+#block check for feed candidate queries on post as p: neither the viewer nor the poster has blocked the other.
+#takes the viewer's user ID twice
+NOT_BLOCKED = """NOT EXISTS (SELECT 1 FROM user_block ub WHERE ub.blocker_id = %s AND ub.blocked_id = p.poster_id)
+AND NOT EXISTS (SELECT 1 FROM user_block ub WHERE ub.blocker_id = p.poster_id AND ub.blocked_id = %s)"""
+
+# user_table
+
+VIEWER_PROFILE = "SELECT username, groups_joined, interests, blocked FROM user_table WHERE user_id = %s"
+
+USERNAMES = "SELECT user_id, username FROM user_table WHERE user_id IN ({placeholders})"
+
+# group_table
+
+GROUP_NAMES = "SELECT group_id, group_name FROM group_table WHERE group_id IN ({placeholders})"
+
+#one row per banned user, or a single row with a NULL user_id for a group without bans
+GROUP_METADATA = """
+SELECT g.group_id, g.private, gb.user_id
+FROM group_table g
+LEFT JOIN group_ban gb ON gb.group_id = g.group_id
+WHERE g.group_id IN ({placeholders})
+"""
+
+# user_block / group_ban
+
+#which of the given posters have blocked the user, served by idx_user_block_blocked
+BLOCKERS_OF_USER = "SELECT blocker_id FROM user_block WHERE blocked_id = %s AND blocker_id IN ({placeholders})"
+
+# group_member
+
+#a group's members off the group_member primary key (migrations/007_group_member.sql), at most the limit
+GROUP_MEMBERS = "SELECT user_id FROM group_member WHERE group_id = %s ORDER BY user_id LIMIT %s"
+
+GROUP_MEMBER_COUNT = "SELECT COUNT(*) FROM group_member WHERE group_id = %s"
+
+# group_interest
+
+INTEREST_GROUPS = "SELECT interest, group_id FROM group_interest WHERE interest IN ({placeholders}) ORDER BY interest, group_id"
+
+#a group's interests, served by idx_group_interest_group
+GROUP_INTERESTS = "SELECT interest FROM group_interest WHERE group_id = %s"
+
+DELETE_GROUP_INTERESTS = "DELETE FROM group_interest WHERE group_id = %s"
+
+INSERT_GROUP_INTEREST = "INSERT IGNORE INTO group_interest (interest, group_id) VALUES (%s, %s)"
+
+# post
+
+#group/poster existence, bans and blocks are checked in the query so each row is already visible to the viewer.
+#args are the group IDs, the viewer twice and the limit
+JOINED_GROUP_POSTS = f"""
+SELECT {CANDIDATE_COLUMNS}
+FROM post p
+JOIN group_table g ON g.group_id = p.group_id
+JOIN user_table u ON u.user_id = p.poster_id
+WHERE p.group_id IN ({{placeholders}})
+AND p.creation_date >= DATE_SUB(NOW(), INTERVAL 3 DAY)
+AND {NOT_BANNED}
+AND {NOT_BLOCKED}
+ORDER BY p.creation_date DESC
+LIMIT %s
+"""
+
+#existence, privacy, bans and blocks are applied before ranking so each group yields its latest visible post.
+#args are the group IDs and the viewer twice
+LATEST_GROUP_POSTS = f"""
+SELECT ranked.*
+FROM (
+    SELECT {CANDIDATE_COLUMNS}, ROW_NUMBER() OVER (PARTITION BY p.group_id ORDER BY p.creation_date DESC) AS group_rank
+    FROM post p
+    JOIN group_table g ON g.group_id = p.group_id
+    JOIN user_table u ON u.user_id = p.poster_id
+    WHERE p.group_id IN ({{placeholders}})
+    AND g.private = 0
+    AND {NOT_BANNED}
+    AND {NOT_BLOCKED}
+) ranked
+WHERE ranked.group_rank = 1
+ORDER BY ranked.creation_date DESC
+"""
+
+#the global fallback's candidate windows hold only public posts the viewer may see, so the limit counts visible posts
+VISIBLE_PUBLIC_POSTS = f"""
+FROM post p
+JOIN group_table g ON g.group_id = p.group_id
+JOIN user_table u ON u.user_id = p.poster_id
+WHERE g.private = 0
+AND {NOT_BANNED}
+AND {NOT_BLOCKED}
+"""
+
+#the newest visible posts of the past days days, capped at the limit (served by idx_post_date); the caller
+#ranks them by score. args are the viewer twice, the days and the limit
+RECENT_POST_WINDOW = f"SELECT {CANDIDATE_COLUMNS} {VISIBLE_PUBLIC_POSTS} AND p.creation_date >= DATE_SUB(NOW(), INTERVAL %s DAY) ORDER BY p.creation_date DESC LIMIT %s"
+
+#top M by score across every post (served by idx_post_score). args are the viewer twice and the limit
+TOP_SCORED_POSTS = f"SELECT {CANDIDATE_COLUMNS} {VISIBLE_PUBLIC_POSTS} ORDER BY p.score DESC, p.creation_date DESC LIMIT %s"
+
+#comments sent inline with each post in feed and profile responses; the rest are served by post_comments.py
+COMMENT_PREVIEW_SIZE = 3
+
+#full rows for the posts on a page, with the comments column cut down to its first COMMENT_PREVIEW_SIZE
+#comments and the comment count appended, so long threads never leave the database.
+#rows are (guid, s3_url, creation_date, poster_id, group_id, caption, edited, comment preview, likes, dislikes, views, comment count)
+POSTS_BY_GUID = f"""
+SELECT guid, s3_url, creation_date, poster_id, group_id, caption, edited,
+JSON_EXTRACT(comments, '$."comments"[0 to {COMMENT_PREVIEW_SIZE - 1}]'),
+likes, dislikes, views,
+JSON_LENGTH(comments, '$."comments"')
+FROM post WHERE guid IN ({{placeholders}})
+"""
+
+#POSTS_BY_GUID for reactions=counts: like_count and dislike_count replace the likes and dislikes lists, and
+#two flags for whether the viewer (the two leading %s) liked or disliked the post are appended
+POSTS_BY_GUID_WITH_REACTION_COUNTS = f"""
+SELECT guid, s3_url, creation_date, poster_id, group_id, caption, edited,
+JSON_EXTRACT(comments, '$."comments"[0 to {COMMENT_PREVIEW_SIZE - 1}]'),
+like_count, dislike_count, views,
+JSON_LENGTH(comments, '$."comments"'),
+COALESCE(JSON_CONTAINS(likes->'$."likes"', JSON_QUOTE(%s)), 0),
+COALESCE(JSON_CONTAINS(dislikes->'$."dislikes"', JSON_QUOTE(%s)), 0)
+FROM post WHERE guid IN ({{placeholders}})
+"""
+
+#one page of a post's comments, selected with a '$."comments"[first to last]' path
+POST_COMMENTS = """SELECT JSON_LENGTH(comments, '$."comments"'), JSON_EXTRACT(comments, %s) FROM post WHERE guid = %s"""
+
+#posts_made paging, served by idx_post_poster_recent and idx_post_group_recent (migrations/005_post_owner_indexes.sql).
+#pages are (guid, creation_date) rows; the *_AFTER statements continue after a (creation_date, guid) cursor.
+#the group statements leave out the group's banned posters
+POST_COUNT_BY_USER = "SELECT COUNT(*) FROM post WHERE poster_id = %s"
+
+POST_COUNT_BY_GROUP = f"SELECT COUNT(*) FROM post p WHERE p.group_id = %s AND {NOT_BANNED}"
+
+POST_PAGE_BY_USER = "SELECT guid, creation_date FROM post WHERE poster_id = %s ORDER BY creation_date DESC, guid DESC LIMIT %s OFFSET %s"
+
+POST_PAGE_BY_GROUP = f"SELECT p.guid, p.creation_date FROM post p WHERE p.group_id = %s AND {NOT_BANNED} ORDER BY p.creation_date DESC, p.guid DESC LIMIT %s OFFSET %s"
+
+POST_PAGE_BY_USER_AFTER = """
+SELECT guid, creation_date FROM post
+WHERE poster_id = %s AND (creation_date < %s OR (creation_date = %s AND guid < %s))
+ORDER BY creation_date DESC, guid DESC LIMIT %s
+"""
+
+POST_PAGE_BY_GROUP_AFTER = f"""
+SELECT p.guid, p.creation_date FROM post p
+WHERE p.group_id = %s AND {NOT_BANNED} AND (p.creation_date < %s OR (p.creation_date = %s AND p.guid < %s))
+ORDER BY p.creation_date DESC, p.guid DESC LIMIT %s
+"""
+
+POST_GROUP_AND_DATE = "SELECT group_id, creation_date FROM post WHERE guid = %s"
+
+#{cases} is one "WHEN %s THEN %s" per post
+INCREMENT_VIEWS = "UPDATE post SET views = views + CASE guid {cases} ELSE 0 END WHERE guid IN ({placeholders})"
+
+# user_timeline / timeline_pull_group
+
+MARK_PULL_GROUP = "INSERT INTO timeline_pull_group (group_id, member_count) VALUES (%s, %s) ON DUPLICATE KEY UPDATE member_count = VALUES(member_count)"
+
+UNMARK_PULL_GROUP = "DELETE FROM timeline_pull_group WHERE group_id = %s"
+
+PULL_GROUPS = "SELECT group_id FROM timeline_pull_group WHERE group_id IN ({placeholders})"
+
+#{values} is one "(%s, %s, %s, %s)" per member
+INSERT_TIMELINE_ENTRIES = "INSERT IGNORE INTO user_timeline (user_id, post_guid, group_id, creation_date) VALUES {values}"
+
+TRIM_EXPIRED_TIMELINE_ENTRIES = "DELETE FROM user_timeline WHERE user_id IN ({placeholders}) AND creation_date < DATE_SUB(NOW(), INTERVAL %s DAY)"
+
+#the extra derived table lets MySQL delete from the table it is ranking
+TRIM_OVERFLOW_TIMELINE_ENTRIES = """
+DELETE FROM user_timeline
+WHERE (user_id, post_guid) IN (
+    SELECT user_id, post_guid FROM (
+        SELECT user_id, post_guid, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY creation_date DESC) AS timeline_rank
+        FROM user_timeline
+        WHERE user_id IN ({placeholders})
+    ) ranked
+    WHERE ranked.timeline_rank > %s
+)
+"""
+
+#args are the user, the days, the user twice more (as the viewer) and the limit
+TIMELINE_POSTS = f"""
+SELECT {CANDIDATE_COLUMNS}
+FROM user_timeline t
+JOIN post p ON p.guid = t.post_guid
+JOIN group_table g ON g.group_id = p.group_id
+JOIN user_table u ON u.user_id = p.poster_id
+WHERE t.user_id = %s
+AND t.creation_date >= DATE_SUB(NOW(), INTERVAL %s DAY)
+AND {NOT_BANNED}
+AND {NOT_BLOCKED}
+ORDER BY t.creation_date DESC
+LIMIT %s
+"""
+
+# user_feed
+
+FEED_ENTRY = "SELECT version, post_ids, complete, UNIX_TIMESTAMP(built_at) FROM user_feed WHERE user_id = %s"
+
+SAVE_FEED_ENTRY = """
+INSERT INTO user_feed (user_id, version, post_ids, complete, built_at) VALUES (%s, %s, %s, %s, FROM_UNIXTIME(%s))
+ON DUPLICATE KEY UPDATE version = VALUES(version), post_ids = VALUES(post_ids), complete = VALUES(complete), built_at = VALUES(built_at)
+"""
+
+DELETE_FEED_ENTRIES = "DELETE FROM user_feed WHERE user_id IN ({placeholders})"
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+#re-sign this many seconds before a cached URL would expire
+REFRESH_MARGIN = 300
+
+#max presigned URLs kept per container
+PRESIGN_CACHE_SIZE = 4096
+
+_s3Client = None
+_s3ClientLock = threading.Lock()
+
+def get_s3_client():
+    # one client per container, reused across warm invocations. boto3 is imported here
+    # rather than at module import since it is the slowest import on the cold start path
+    global _s3Client
+    with _s3ClientLock:
+        if _s3Client is None:
+            import boto3
+            _s3Client = boto3.client('s3',region_name="us-east-1",config=boto3.session.Config(signature_version='s3v4',))
+        return _s3Client
+
+def s3_signer(bucket_name, object_name, expiration):
+    return get_s3_client().generate_presigned_url('get_object',Params={'Bucket': bucket_name,'Key': object_name},ExpiresIn=expiration)
+
+class PresignedUrlCache:
+    """
+    Caches presigned GET URLs by bucket, object key and expiry. An entry is
+    dropped REFRESH_MARGIN seconds before the URL itself expires, so a cached
+    URL always has at least that long left to live when it is handed out.
+    The signer is injectable so the cache can be exercised without AWS.
+    """
+
+    def __init__(self, signer=s3_signer, maxsize=PRESIGN_CACHE_SIZE, refreshMargin=REFRESH_MARGIN, clock=time.monotonic):
+        self.signer = signer
+        self.refreshMargin = refreshMargin
+        self._urls = TTLCache(maxsize, 0, clock)
+
+    def get_url(self, bucket_name, object_name, expiration):
+        key = (bucket_name, object_name, expiration)
+        url = self._urls.get(key)
+        if url is None:
+            url = self.signer(bucket_name, object_name, expiration)
+            ttl = expiration - self.refreshMargin
+            if ttl > 0:
+                self._urls.put(key, url, ttl)
+        return url
+
+    @property
+    def hits(self):
+        return self._urls.hits
+
+    @property
+    def misses(self):
+        return self._urls.misses
+
+    def stats(self):
+        return self._urls.stats()
+
+presignedUrls = PresignedUrlCache()
+
+def create_presigned_url(bucket_name, object_name, expiration=600):
+    # Generate (or reuse) a presigned URL for the S3 object
+    try:
+        response = presignedUrls.get_url(bucket_name, object_name, expiration)
+    except Exception as e:
+        logging.error(e)
+        return "Error"
+
+    return response
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the handlers are flat top-level modules, imported from the repository root like in the Lambda bundle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+from bench import fake_rds
+from migrations.backfill_group_member import backfill
+
+def test_backfill_pages_through_every_user_and_skips_bad_json():
+    db = fake_rds.open_database()
+    db.executemany("INSERT INTO user_table (user_id, groups_joined) VALUES (?, ?)", [
+        ("u1", '{"groups": ["g1", "g2"]}'),
+        ("u2", "not json"),
+        ("u3", None),
+        ("u4", '{"groups": ["g1"]}'),
+        ("u5", '{"groups": ["g3"]}')
+    ])
+
+    # a batch size that does not divide the users, so the last batch is short
+    assert backfill(fake_rds.FakeConnection(db, fake_rds.QueryStats()), 2) == 5
+
+    rows = db.execute("SELECT group_id, user_id FROM group_member ORDER BY group_id, user_id").fetchall()
+    assert rows == [("g1", "u1"), ("g1", "u4"), ("g2", "u1"), ("g3", "u5")]
@@ -0,0 +1,32 @@
+import pathlib
+import re
+
+from bench import fake_rds
+
+MIGRATIONS = pathlib.Path(__file__).resolve().parent.parent / "migrations"
+
+def index_columns(columns):
+    return tuple(column.strip() for column in columns.split(","))
+
+def migration_indexes():
+    # {index name: (table, columns)} once every migration has run in order
+    indexes = {}
+    for path in sorted(MIGRATIONS.glob("*.sql")):
+        sql = re.sub(r"--[^\n]*", "", path.read_text())
+        for statement in sql.split(";"):
+            table = re.search(r"(?:CREATE|ALTER) TABLE (\w+)", statement)
+            for name in re.findall(r"DROP INDEX (\w+)", statement):
+                indexes.pop(name, None)
+            for name, onTable, columns in re.findall(r"CREATE INDEX (\w+) ON (\w+) \(([^)]*)\)", statement):
+                indexes[name] = (onTable, index_columns(columns))
+            for name, columns in re.findall(r"(?:ADD INDEX|(?<!PRIMARY )KEY) (\w+) \(([^)]*)\)", statement):
+                indexes[name] = (table.group(1), index_columns(columns))
+    return indexes
+
+def fake_indexes():
+    db = fake_rds.open_database()
+    rows = db.execute("SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+    return {name: (table, index_columns(re.search(r"\(([^)]*)\)", sql).group(1))) for name, table, sql in rows}
+
+def test_fake_has_exactly_the_migration_indexes():
+    assert fake_indexes() == migration_indexes()
@@ -0,0 +1,114 @@
+import pytest
+
+import feed_store
+import post_feed
+from feed_store import FEED_TTL, FeedEntry, InProcessFeedStore, SqliteFeedStore
+from post_record import PostRecord
+
+def test_entry_is_fresh_for_its_version_until_ttl():
+    entry = FeedEntry("v1", ["a", "b"], False, builtAt=1000.0)
+
+    assert entry.is_fresh("v1", now=1000.0 + FEED_TTL - 1)
+    assert not entry.is_fresh("v1", now=1000.0 + FEED_TTL)
+    assert not entry.is_fresh("v2", now=1000.0)
+
+def test_entry_covers_count():
+    partial = FeedEntry("v1", ["a", "b", "c"], False)
+    complete = FeedEntry("v1", ["a"], True)
+
+    assert partial.covers(3)
+    assert not partial.covers(4)
+    # a complete feed covers any page, however short it is
+    assert complete.covers(100)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request):
+    if request.param == "sqlite":
+        return SqliteFeedStore()
+    return InProcessFeedStore()
+
+def test_store_round_trip(store):
+    store.put("user-1", FeedEntry("v1", ["a", "b"], True, builtAt=1234.5))
+
+    entry = store.get("user-1")
+    assert (entry.version, entry.postIDs, entry.complete, entry.builtAt) == ("v1", ["a", "b"], True, 1234.5)
+    assert store.get("user-2") is None
+
+def test_store_invalidation(store):
+    for userID in ("user-1", "user-2", "user-3"):
+        store.put(userID, FeedEntry("v1", ["a"], True))
+
+    store.invalidate("user-1")
+    store.invalidate_many(["user-2", "missing"])
+
+    assert store.get("user-1") is None
+    assert store.get("user-2") is None
+    assert store.get("user-3") is not None
+
+def test_memory_store_stays_within_its_size():
+    store = InProcessFeedStore(maxsize=3)
+    for number in range(10):
+        store.put(f"user-{number}", FeedEntry("v1", ["a"], True))
+
+    assert len(store) == 3
+    assert store.get("user-0") is None
+    assert store.get("user-9") is not None
+
+def test_open_feed_store_by_name():
+    assert isinstance(feed_store.open_feed_store("memory", None), InProcessFeedStore)
+    assert isinstance(feed_store.open_feed_store("sqlite", None), SqliteFeedStore)
+    assert isinstance(feed_store.open_feed_store("mysql", None), feed_store.MySQLFeedStore)
+
+def post_row(guid, posterID, groupID):
+    return (guid, None, "2026-01-01 00:00:00", posterID, groupID, "caption", 0, None, None, None, 0, 0)
+
+class Viewer:
+    userID = "viewer"
+
+    def __init__(self, blocked=(), groups=()):
+        self.blocked = set(blocked)
+        self.groups = list(groups)
+
+    def resolve_blocked_by(self, conn, posterIDs):
+        list(posterIDs)
+
+    def can_see(self, posterID):
+        return posterID not in self.blocked
+
+@pytest.fixture
+def page(monkeypatch):
+    # load_page_posts with the database lookups replaced by a fixed page of posts
+    posts = [PostRecord(post_row(guid, poster, group)) for guid, poster, group in (("a", "poster-1", "group-1"), ("b", "poster-2", "group-1"), ("c", "poster-3", "private-group"))]
+    store = InProcessFeedStore()
+    monkeypatch.setattr(post_feed, "feedStore", store)
+    monkeypatch.setattr(post_feed, "load_posts", lambda conn, postIDs, reactionCounts, viewerID: [post for post in posts if post.postID in postIDs])
+    monkeypatch.setattr(post_feed, "load_groups", lambda conn, groupIDs: None)
+    monkeypatch.setattr(post_feed, "group_exists", lambda conn, groupID: True)
+    monkeypatch.setattr(post_feed, "is_banned", lambda conn, userID, groupID: False)
+    monkeypatch.setattr(post_feed, "is_private_to", lambda conn, groupID, joinedGroups: groupID == "private-group" and groupID not in joinedGroups)
+    store.put("viewer", FeedEntry("v1", ["a", "b", "c"], True))
+    return store
+
+def test_page_with_every_post_keeps_stored_feed(page):
+    pagePosts = post_feed.load_page_posts(None, Viewer(groups=["private-group"]), ["a", "b", "c"])
+
+    assert [post.postID for post in pagePosts] == ["a", "b", "c"]
+    assert page.get("viewer") is not None
+
+def test_filtered_page_drops_stored_feed(page):
+    pagePosts = post_feed.load_page_posts(None, Viewer(blocked=["poster-2"], groups=["private-group"]), ["a", "b", "c"])
+
+    assert [post.postID for post in pagePosts] == ["a", "c"]
+    assert page.get("viewer") is None
+
+def test_group_gone_private_drops_its_posts(page):
+    pagePosts = post_feed.load_page_posts(None, Viewer(), ["a", "b", "c"])
+
+    assert [post.postID for post in pagePosts] == ["a", "b"]
+    assert page.get("viewer") is None
+
+def test_deleted_post_drops_stored_feed(page):
+    pagePosts = post_feed.load_page_posts(None, Viewer(), ["a", "gone"])
+
+    assert [post.postID for post in pagePosts] == ["a"]
+    assert page.get("viewer") is None
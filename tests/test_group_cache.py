@@ -0,0 +1,22 @@
+import pytest
+
+import group_cache
+from group_cache import GroupMeta, is_private_to
+
+@pytest.fixture(autouse=True)
+def cached_groups():
+    # groups already in the cache, so no lookup reaches the database
+    group_cache.groupCache.clear()
+    group_cache.groupCache.put("public", GroupMeta("public", False, frozenset()))
+    group_cache.groupCache.put("private", GroupMeta("private", True, frozenset()))
+    group_cache.groupCache.put("deleted", None)
+    yield
+    group_cache.groupCache.clear()
+
+def test_private_group_is_hidden_from_non_members():
+    assert is_private_to(None, "private", set())
+    assert not is_private_to(None, "private", {"private"})
+
+def test_public_and_deleted_groups_are_not_private():
+    assert not is_private_to(None, "public", set())
+    assert not is_private_to(None, "deleted", set())
@@ -0,0 +1,25 @@
+import pytest
+
+import interest_index
+from bench import fake_rds
+from interest_index import groups_for_interests, sync_group_interests
+
+@pytest.fixture
+def conn():
+    interest_index.interestGroupCache.clear()
+    db = fake_rds.open_database()
+    db.executemany("INSERT INTO group_interest VALUES (?, ?)", [("chess", "g1"), ("go", "g1"), ("chess", "g2")])
+    yield fake_rds.FakeConnection(db, fake_rds.QueryStats())
+    interest_index.interestGroupCache.clear()
+
+def test_groups_for_interests_in_interest_order(conn):
+    assert groups_for_interests(conn, ["go", "chess"]) == ["g1", "g2"]
+
+def test_sync_drops_cached_old_and_new_interests(conn):
+    assert groups_for_interests(conn, ["chess", "go", "poker"]) == ["g1", "g2"]
+
+    sync_group_interests(conn, "g1", ["poker"])
+
+    assert groups_for_interests(conn, ["chess"]) == ["g2"]
+    assert groups_for_interests(conn, ["go"]) == []
+    assert groups_for_interests(conn, ["poker"]) == ["g1"]
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+import mix_db
+from mix_db import ConnectionPool, DatabaseError
+
+class FakeMySQLError(Exception):
+    pass
+
+class FakeDriver:
+    MySQLError = FakeMySQLError
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.open = True
+        self.pings = 0
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+        if not self.alive:
+            raise FakeMySQLError("MySQL server has gone away")
+
+class CountingFactory:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+@pytest.fixture(autouse=True)
+def fake_driver(monkeypatch):
+    monkeypatch.setattr(mix_db, "_pymysql", FakeDriver)
+
+def test_reuses_idle_connection():
+    factory = CountingFactory()
+    pool = ConnectionPool(2, factory)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert second is first
+    assert len(factory.opened) == 1
+
+def test_pings_only_after_idle(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(mix_db.time, "monotonic", lambda: clock[0])
+    pool = ConnectionPool(1, CountingFactory())
+
+    with pool.connection() as conn:
+        pass
+    with pool.connection():
+        pass
+    assert conn.pings == 0
+
+    clock[0] += mix_db.PING_AFTER_IDLE + 1
+    with pool.connection():
+        pass
+    assert conn.pings == 1
+
+def test_pings_closed_connection():
+    pool = ConnectionPool(1, CountingFactory())
+
+    with pool.connection() as conn:
+        conn.open = False
+    with pool.connection():
+        pass
+
+    assert conn.pings == 1
+
+def test_replaces_connection_that_fails_ping():
+    factory = CountingFactory()
+    pool = ConnectionPool(1, factory)
+
+    with pool.connection() as first:
+        first.open = False
+    first.alive = False
+    with pool.connection() as second:
+        pass
+
+    assert second is not first
+    assert len(factory.opened) == 2
+    assert pool._opened == 1
+
+def test_failed_open_gives_back_its_slot():
+    def failing():
+        raise DatabaseError("could not connect")
+    pool = ConnectionPool(1, failing)
+
+    with pytest.raises(DatabaseError):
+        with pool.connection():
+            pass
+
+    assert pool._opened == 0
+
+def test_checkout_times_out_when_pool_is_exhausted(monkeypatch):
+    monkeypatch.setattr(mix_db, "POOL_WAIT_TIMEOUT", 0.01)
+    pool = ConnectionPool(1, CountingFactory())
+
+    with pool.connection():
+        with pytest.raises(DatabaseError):
+            with pool.connection():
+                pass
+
+def test_waiting_checkout_gets_released_connection():
+    pool = ConnectionPool(1, CountingFactory())
+    received = []
+
+    with pool.connection() as held:
+        waiter = threading.Thread(target=lambda: received.append(pool._acquire()))
+        waiter.start()
+    waiter.join(timeout=1)
+
+    assert received == [held]
@@ -0,0 +1,24 @@
+import json
+
+import post_feed
+from feed_store import InProcessFeedStore
+from mix_db import ConnectionPool, DatabaseError
+
+def failing_connect():
+    raise DatabaseError("could not connect to MySQL after 3 attempts")
+
+def feed_event(page="1"):
+    return {"queryStringParameters": {"userID": "u1", "page": page}}
+
+def test_stage_connection_failure_is_service_unavailable(monkeypatch):
+    viewer = post_feed.ViewerContext("u1", "viewer", [], [], [], 1)
+    monkeypatch.setattr(post_feed, "STAGE_EXECUTION", "threads")
+    monkeypatch.setattr(post_feed, "stagePool", ConnectionPool(post_feed.STAGE_WORKERS, failing_connect))
+    monkeypatch.setattr(post_feed, "feedStore", InProcessFeedStore())
+    monkeypatch.setattr(post_feed, "get_connection", lambda: object())
+    monkeypatch.setattr(post_feed.ViewerContext, "load", classmethod(lambda cls, conn, userID: viewer))
+
+    response = post_feed.lambda_handler(feed_event(), None)
+
+    assert response["statusCode"] == 503
+    assert json.loads(response["body"]) == "Service unavailable: could not connect to the database"
@@ -0,0 +1,66 @@
+import datetime
+import json
+
+import pytest
+
+import mix_db
+import posts_made
+from bench import fake_rds
+from posts_made import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    creationDate = datetime.datetime(2026, 1, 2, 3, 4, 5)
+
+    assert decode_cursor(encode_cursor(creationDate, "post-7")) == ("2026-01-02 03:04:05", "post-7")
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor("2026-01-01", "a")[:-4], "WzFd"])
+def test_decode_cursor_rejects_foreign_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+@pytest.fixture
+def posts_db():
+    # 35 posts in one group by three posters, several sharing a creation_date so the guid breaks ties
+    db = fake_rds.open_database()
+    db.executemany("INSERT INTO user_table (user_id, username) VALUES (?, ?)", [(f"poster-{number}", f"name-{number}") for number in range(3)])
+    db.execute("INSERT INTO group_table (group_id, group_name) VALUES ('group-1', 'Group')")
+    db.execute("INSERT INTO group_ban VALUES ('group-1', 'poster-2')")
+    db.executemany("INSERT INTO post (guid, creation_date, poster_id, group_id, caption, edited, views) VALUES (?, ?, ?, ?, ?, 0, 0)", [
+        (f"post-{number:02d}", f"2026-01-01 {number // 3:02d}:00:00", f"poster-{number % 3}", "group-1", "caption")
+        for number in range(35)
+    ])
+    mix_db.set_connection(fake_rds.FakeConnection(db, fake_rds.QueryStats()))
+    posts_made.postCountCache.clear()
+    yield db
+    posts_made.postCountCache.clear()
+    mix_db.set_connection(None)
+
+def posts_made_page(nameType, id, page, cursor=None):
+    params = {"nameType": nameType, "id": id, "page": str(page)}
+    if cursor is not None:
+        params["cursor"] = cursor
+    response = posts_made.lambda_handler({"queryStringParameters": params}, None)
+    assert response["statusCode"] == 200
+    return json.loads(response["body"])
+
+#poster-0 made 12 of the posts; the group shows the 24 not made by its banned poster-2
+@pytest.mark.parametrize("nameType, id, expectedPosts", [("user", "poster-0", 12), ("group", "group-1", 24)])
+def test_cursor_paging_matches_offset_paging(posts_db, nameType, id, expectedPosts):
+    offsetPages = []
+    for page in range(1, posts_made_page(nameType, id, 1)["numPages"] + 1):
+        offsetPages.append([post["ID"] for post in posts_made_page(nameType, id, page)["posts"]])
+
+    cursorPages = []
+    cursor = None
+    page = 1
+    while True:
+        body = posts_made_page(nameType, id, page, cursor)
+        cursorPages.append([post["ID"] for post in body["posts"]])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+        page += 1
+
+    assert cursorPages == offsetPages
+    postIDs = [postID for page in offsetPages for postID in page]
+    assert len(set(postIDs)) == len(postIDs) == expectedPosts
@@ -0,0 +1,71 @@
+from s3_presign import PresignedUrlCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class CountingSigner:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, bucket_name, object_name, expiration):
+        self.calls += 1
+        return f"https://{bucket_name}/{object_name}?expires={expiration}&sig={self.calls}"
+
+def make_cache(refreshMargin=300):
+    clock = FakeClock()
+    signer = CountingSigner()
+    return PresignedUrlCache(signer=signer, refreshMargin=refreshMargin, clock=clock), signer, clock
+
+def test_reuses_url_until_refresh_margin():
+    cache, signer, clock = make_cache()
+
+    first = cache.get_url("bucket", "a.png", 3600)
+    clock.now += 3600 - 300 - 1
+    assert cache.get_url("bucket", "a.png", 3600) == first
+    assert signer.calls == 1
+
+def test_resigns_refresh_margin_before_expiry():
+    cache, signer, clock = make_cache()
+
+    first = cache.get_url("bucket", "a.png", 3600)
+    clock.now += 3600 - 300
+    second = cache.get_url("bucket", "a.png", 3600)
+
+    assert second != first
+    assert signer.calls == 2
+
+def test_keys_on_bucket_object_and_expiration():
+    cache, signer, clock = make_cache()
+
+    cache.get_url("bucket", "a.png", 3600)
+    cache.get_url("bucket", "b.png", 3600)
+    cache.get_url("other", "a.png", 3600)
+    cache.get_url("bucket", "a.png", 7200)
+
+    assert signer.calls == 4
+
+def test_counts_hits_and_misses():
+    cache, signer, clock = make_cache()
+
+    cache.get_url("bucket", "a.png", 3600)
+    cache.get_url("bucket", "a.png", 3600)
+    cache.get_url("bucket", "a.png", 3600)
+    cache.get_url("bucket", "b.png", 3600)
+
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 2}
+
+def test_short_expiry_is_never_cached():
+    # a URL that would not outlive the refresh margin is signed fresh every time
+    cache, signer, clock = make_cache()
+
+    cache.get_url("bucket", "a.png", 300)
+    cache.get_url("bucket", "a.png", 300)
+    cache.get_url("bucket", "b.png", 60)
+
+    assert signer.calls == 3
+    assert cache.stats()["size"] == 0
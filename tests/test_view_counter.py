@@ -0,0 +1,83 @@
+import pytest
+
+import view_counter
+from bench import fake_rds
+from view_counter import ViewCounter, increment_views
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class RecordingWriter:
+    def __init__(self):
+        self.writes = []
+        self.failing = False
+
+    def __call__(self, conn, viewCounts):
+        if self.failing:
+            raise RuntimeError("MySQL server has gone away")
+        self.writes.append(dict(viewCounts))
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(view_counter, "increment_views", writer)
+    return writer
+
+def test_increment_views_adds_each_posts_count():
+    db = fake_rds.open_database()
+    db.executemany("INSERT INTO post (guid, views) VALUES (?, ?)", [("a", 5), ("b", 0), ("c", 1)])
+
+    increment_views(fake_rds.FakeConnection(db, fake_rds.QueryStats()), {"a": 2, "b": 1})
+
+    assert db.execute("SELECT guid, views FROM post ORDER BY guid").fetchall() == [("a", 7), ("b", 1), ("c", 1)]
+
+def test_flushes_every_page_without_write_behind(writer):
+    counter = ViewCounter()
+
+    counter.record(None, ["a", "b"])
+    counter.record(None, ["a"])
+
+    assert writer.writes == [{"a": 1, "b": 1}, {"a": 1}]
+
+def test_write_behind_coalesces_across_records(writer):
+    clock = FakeClock()
+    counter = ViewCounter(writeBehind=True, maxPosts=3, maxAge=30, clock=clock)
+
+    counter.record(None, ["a", "b"])
+    counter.record(None, ["a", "b"])
+    assert writer.writes == []
+
+    counter.record(None, ["a", "c"])
+    assert writer.writes == [{"a": 3, "b": 2, "c": 1}]
+    assert counter.pending == {}
+
+def test_write_behind_flushes_once_oldest_view_reaches_max_age(writer):
+    clock = FakeClock()
+    counter = ViewCounter(writeBehind=True, maxPosts=100, maxAge=30, clock=clock)
+
+    counter.record(None, ["a"])
+    clock.now += 29
+    counter.record(None, ["b"])
+    assert writer.writes == []
+
+    # the age is measured from the oldest pending view, not the latest
+    clock.now += 1
+    counter.record(None, ["b"])
+    assert writer.writes == [{"a": 1, "b": 2}]
+
+def test_failed_flush_keeps_pending_counts(writer):
+    clock = FakeClock()
+    counter = ViewCounter(writeBehind=True, maxPosts=2, maxAge=30, clock=clock)
+
+    writer.failing = True
+    counter.record(None, ["a", "b"])
+    assert counter.pending == {"a": 1, "b": 1}
+
+    writer.failing = False
+    counter.record(None, ["a"])
+    assert writer.writes == [{"a": 2, "b": 1}]
+    assert counter.pending == {}
@@ -0,0 +1,61 @@
+import logging
+import json
+import os
+import queries
+from instrumentation import instrumented
+from mix_db import get_connection, fetch_one, DatabaseError, database_unavailable
+from timelines import fan_out_post
+from feed_store import open_feed_store
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+#materialized feeds of the members are dropped so the new post shows up on their next read. That only
+#reaches post_feed with feedStore=mysql: memory and sqlite stores are local to each container, so with
+#those the members see the new post once their stored feed expires (feed_store.FEED_TTL)
+FEED_STORE = os.environ.get('feedStore', 'memory')
+feedStore = open_feed_store(FEED_STORE, get_connection) if FEED_STORE == "mysql" else None
+
+@instrumented("timeline_fanout")
+def lambda_handler(event, context):
+    """
+    This function copies a newly created post onto its group members' timelines.
+    Invoke it from the post creation path with the new post's ID.
+    """
+    
+    try:
+        postID = event['queryStringParameters']['postID']
+    except:
+        return {
+            'statusCode': 400,
+            'body': json.dumps("Bad request: incorrect parameters", default=str)
+        }
+    
+    try:
+        conn = get_connection()
+    except DatabaseError as e:
+        return database_unavailable(e)
+    
+    postResult = fetch_one(conn, queries.POST_GROUP_AND_DATE, postID)
+    
+    if postResult is None: 
+        return {
+            'statusCode': 404, 
+            'body': "Error, could not find post with the given ID."
+        }
+    
+    members = fan_out_post(conn, postID, postResult[0], postResult[1])
+    
+    if members is None: 
+        return {
+            'statusCode': 200,
+            'body': json.dumps({"fannedOut": 0, "pullOnRead": True}, default=str)
+        }
+    
+    if feedStore is not None:
+        feedStore.invalidate_many(members)
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({"fannedOut": len(members), "pullOnRead": False}, default=str)
+    }
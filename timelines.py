@@ -0,0 +1,69 @@
+import queries
+from mix_db import execute, fetch_all, fetch_one
+
+#timelines only hold posts from the past TIMELINE_DAYS days, at most TIMELINE_MAX_POSTS per user
+TIMELINE_DAYS = 3
+TIMELINE_MAX_POSTS = 500
+
+#groups with more members than this are not fanned out and are read with pull-on-read instead
+FANOUT_MAX_MEMBERS = 5000
+
+#timeline rows written per INSERT
+FANOUT_BATCH_SIZE = 1000
+
+def group_member_ids(conn, groupID, limit):
+    return [result[0] for result in fetch_all(conn, queries.GROUP_MEMBERS, (groupID, limit))]
+
+def fan_out_post(conn, postID, groupID, creationDate):
+    """
+    Appends a new post to the timeline of every member of its group and
+    trims those timelines. Returns the members written to, or None when the
+    group is over FANOUT_MAX_MEMBERS and was marked for pull-on-read.
+    """
+    #one member past the cap is enough to know the group is too large; only then is it counted
+    members = group_member_ids(conn, groupID, FANOUT_MAX_MEMBERS + 1)
+
+    if len(members) > FANOUT_MAX_MEMBERS:
+        memberCount = fetch_one(conn, queries.GROUP_MEMBER_COUNT, groupID)[0]
+        execute(conn, queries.MARK_PULL_GROUP, (groupID, memberCount))
+        return None
+
+    execute(conn, queries.UNMARK_PULL_GROUP, groupID)
+
+    for start in range(0, len(members), FANOUT_BATCH_SIZE):
+        batch = members[start:start + FANOUT_BATCH_SIZE]
+        args = []
+        for userID in batch:
+            args.extend((userID, postID, groupID, creationDate))
+        execute(conn, queries.INSERT_TIMELINE_ENTRIES.format(values=", ".join(["(%s, %s, %s, %s)"] * len(batch))), args)
+
+    trim_timelines(conn, members)
+    return members
+
+def trim_timelines(conn, userIDs):
+    """
+    Drops timeline entries older than TIMELINE_DAYS and anything past each
+    user's newest TIMELINE_MAX_POSTS.
+    """
+    for start in range(0, len(userIDs), FANOUT_BATCH_SIZE):
+        batch = userIDs[start:start + FANOUT_BATCH_SIZE]
+        execute(conn, queries.with_in_list(queries.TRIM_EXPIRED_TIMELINE_ENTRIES, len(batch)), (*batch, TIMELINE_DAYS))
+        execute(conn, queries.with_in_list(queries.TRIM_OVERFLOW_TIMELINE_ENTRIES, len(batch)), (*batch, TIMELINE_MAX_POSTS))
+
+def read_timeline(conn, userID, limit):
+    """
+    Returns the newest posts on a user's timeline from the past
+    TIMELINE_DAYS days, newest first, with deleted groups and posters,
+    banned posters and posters blocking (or blocked by) the user already
+    left out.
+    """
+    return fetch_all(conn, queries.TIMELINE_POSTS, (userID, TIMELINE_DAYS, userID, userID, limit))
+
+def pull_on_read_groups(conn, groupIDs):
+    """
+    Returns which of the given groups were too large to fan out.
+    """
+    if not groupIDs:
+        return []
+
+    return [result[0] for result in fetch_all(conn, queries.with_in_list(queries.PULL_GROUPS, len(groupIDs)), groupIDs)]
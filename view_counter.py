@@ -0,0 +1,79 @@
+import logging
+import os
+import time
+
+import queries
+from mix_db import execute
+
+logger = logging.getLogger()
+
+#write-behind mode flushes once this many posts are pending or the oldest pending view is this many seconds old
+WRITE_BEHIND_MAX_POSTS = 200
+WRITE_BEHIND_MAX_AGE = 30
+
+def increment_views(conn, viewCounts):
+    """
+    Adds each post's pending views in a single UPDATE, whatever the number
+    of posts. viewCounts maps post guid to the number of views to add.
+    """
+    if not viewCounts:
+        return
+
+    guids = list(viewCounts)
+    query = queries.INCREMENT_VIEWS.format(cases=" ".join(["WHEN %s THEN %s"] * len(guids)), placeholders=queries.in_placeholders(len(guids)))
+
+    args = []
+    for guid in guids:
+        args.extend((guid, viewCounts[guid]))
+    args.extend(guids)
+
+    execute(conn, query, args)
+
+class ViewCounter:
+    """
+    Collects view increments for rendered posts. By default every page is
+    flushed straight away as one statement. In write-behind mode increments
+    are coalesced across warm invocations and only written once the buffer
+    passes maxPosts or maxAge, so most reads never wait on a write. Views
+    still buffered when a container is recycled are lost, which is the
+    trade-off for taking the write off the read path.
+    """
+
+    def __init__(self, writeBehind=False, maxPosts=WRITE_BEHIND_MAX_POSTS, maxAge=WRITE_BEHIND_MAX_AGE, clock=time.monotonic):
+        self.writeBehind = writeBehind
+        self.maxPosts = maxPosts
+        self.maxAge = maxAge
+        self.clock = clock
+        self.pending = {}
+        self.oldestPending = None
+
+    def record(self, conn, guids):
+        for guid in guids:
+            self.pending[guid] = self.pending.get(guid, 0) + 1
+        if self.pending and self.oldestPending is None:
+            self.oldestPending = self.clock()
+
+        if not self.writeBehind or self.should_flush():
+            self.flush(conn)
+
+    def should_flush(self):
+        if not self.pending:
+            return False
+        return len(self.pending) >= self.maxPosts or self.clock() - self.oldestPending >= self.maxAge
+
+    def flush(self, conn):
+        if not self.pending:
+            return
+
+        try:
+            increment_views(conn, self.pending)
+        except Exception as e:
+            # keep the counts so the next flush retries them
+            logger.error("ERROR: Could not update post views.")
+            logger.error(e)
+            return
+
+        self.pending = {}
+        self.oldestPending = None
+
+viewCounter = ViewCounter(writeBehind=os.environ.get('viewWriteBehind', 'false').lower() == 'true')